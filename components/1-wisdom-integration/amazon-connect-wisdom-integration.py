@@ -5,22 +5,36 @@
 import os
 import json
 import urllib3
+from concurrent.futures import ThreadPoolExecutor
 http = urllib3.PoolManager()
 
 # AWS SDK Imports
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
-CONNECT_CLIENT = boto3.client('connect')
-WISDOM_CLIENT = boto3.client('wisdom')
+# Module level clients are shared by every code path. Adaptive retry mode backs off on throttling responses.
+# Reference: https://boto3.amazonaws.com/v1/documentation/api/latest/guide/retries.html#adaptive-retry-mode
+BOTO_CONFIG = Config(retries={"mode": "adaptive", "max_attempts": 5})
+CONNECT_CLIENT = boto3.client('connect', config=BOTO_CONFIG)
+WISDOM_CLIENT = boto3.client('wisdom', config=BOTO_CONFIG)
 
 # STACK_UUID: Substring of CloudFormation StackID. Used to identify and tag resources
 STACK_UUID = os.environ["STACK_UUID"] 
 
+# Integration Types managed by this function, and the Resource Property holding the desired Wisdom resource ARN of each type.
+INTEGRATION_TYPES = {
+    "WISDOM_ASSISTANT": "WISDOM_ASSISTANT_ARN",
+    "WISDOM_KNOWLEDGE_BASE": "WISDOM_KNOWLEDGE_BASE_ARN"
+}
+FAILED_STATUSES = ("CLIENT_ERROR", "EXCEPTION")
+
 # This AWS Lambda Function will: 
-# 1) Check for Existing Amazon Connect Integration Associations - Wisdom.
-# **NOTE**: If the Connect Instance has an existing Integration Association, the Integration Association will be deleted and replaced with the new Integration Association.
-# 2) Create an Amazon Connect Integration Association with an Amazon Connect Wisdom (Assistant and KnowledgeBase).
+# 1) List the existing Amazon Connect Integration Associations - Wisdom (Assistant and KnowledgeBase), all pages.
+# 2) Reconcile them with the provided Amazon Connect Wisdom (Assistant and KnowledgeBase) ARNs. Create/Update is idempotent:
+#    - If the Connect Instance is already integrated with the provided Wisdom resources, no change is made.
+#    - Otherwise, the new Integration Association is created and the existing Integration Association is replaced (see reconcileIntegrationAssociation).
+# Both Integration Types are listed and reconciled concurrently.
 def lambda_handler(event, context):
     print("Event Recieved: ", json.dumps(event))
     print("Request Type:", event['RequestType'])
@@ -34,10 +48,10 @@ def lambda_handler(event, context):
 
     # Check for existing Integrations: List Integration Association - Wisdom Assistant / Knowledge Base
     # Full Assistant/KnowledgeBase Integration Association Object: [{'IntegrationAssociationId': 'string', 'IntegrationAssociationArn': 'string', 'InstanceId': 'string', 'IntegrationType': 'WISDOM_ASSISTANT', 'IntegrationArn': 'string'}]
-    connectWisdomAssistantIntegration = listIntegrationAssociations(instanceId=INSTANCE_ARN, integrationType="WISDOM_ASSISTANT")
-    connectWisdomKnowledgeBaseIntegration = listIntegrationAssociations(instanceId=INSTANCE_ARN, integrationType="WISDOM_KNOWLEDGE_BASE")
-    print("Connect Integration - Wisdom Assistant ", json.dumps(connectWisdomAssistantIntegration))    
-    print("Connect Integration - Wisdom Knowledgebase ", json.dumps(connectWisdomKnowledgeBaseIntegration))
+    with ThreadPoolExecutor(max_workers=len(INTEGRATION_TYPES)) as executor:
+        existingIntegrations = dict(zip(INTEGRATION_TYPES, executor.map(lambda integrationType: listIntegrationAssociations(INSTANCE_ARN, integrationType), INTEGRATION_TYPES)))
+    print("Connect Integration - Wisdom Assistant ", json.dumps(existingIntegrations["WISDOM_ASSISTANT"]))    
+    print("Connect Integration - Wisdom Knowledgebase ", json.dumps(existingIntegrations["WISDOM_KNOWLEDGE_BASE"]))
 
     # Define shared ResponseData Expected by CloudFormation Response:
     responseData = {
@@ -49,77 +63,111 @@ def lambda_handler(event, context):
 
     # Case 1: CloudFormation Stack sends Create or Update Event.
     if event["RequestType"] == "Create" or event["RequestType"] == "Update":
-        # Case 1: If the Connect Instance has existing Wisdom Integrations (both Assistant and KnowledgeBase) return those values.
-        if len(connectWisdomAssistantIntegration) and len(connectWisdomKnowledgeBaseIntegration):
-            # Roadmap: Delete Existing Integration Associations, create new Integration Associations with resources.
-            print("Connect Instance: ", INSTANCE_ARN, " has existing Wisdom integrations.")
-
-            # Return previous Integration Association Data
-            responseData["Previous_Connect_WisdomAssistant_IntegrationAssociation"] = str(connectWisdomAssistantIntegration[0])
-            responseData["Previous_Wisdom_Assistant_ARN"] = str(connectWisdomAssistantIntegration[0]['IntegrationArn'])
-            responseData["Previous_Connect_WisdomKnowledgeBase_IntegrationAssociation"] = str(connectWisdomKnowledgeBaseIntegration[0])
-            responseData["Previous_Wisdom_KnowledgeBase_ARN"] = str(connectWisdomKnowledgeBaseIntegration[0]['IntegrationArn'])
-        
-            deleteConnectWisdomAssistantIntegration = deleteIntegrationAssociation(instanceId=INSTANCE_ARN, integrationAssociationId=connectWisdomAssistantIntegration[0]['IntegrationAssociationId'])
-            print("Delete Complete: Amazon Connect Integration Association - Wisdom Assistant: ", connectWisdomAssistantIntegration[0]['IntegrationAssociationId'])
-
-            deleteConnectWisdomKnowledgeBaseIntegration = deleteIntegrationAssociation(instanceId=INSTANCE_ARN, integrationAssociationId=connectWisdomKnowledgeBaseIntegration[0]['IntegrationAssociationId'])
-            print("Delete Complete: Amazon Connect Integration Association - Wisdom KnowledgeBase: ", connectWisdomKnowledgeBaseIntegration[0]['IntegrationAssociationId'])
-        else:
-            print("Connect Instance: ", INSTANCE_ARN, " has no existing Wisdom integrations.")
-        
-        # Step 2: Create new Integration Associations with provided Wisdom Assistant and Knowledge Base
-        # At this point, Connect Instance has no existing Wisdom Integrations.
-        if len(WISDOM_ASSISTANT_ARN) > 0:
-            connectWisdomAssistantIntegration = createIntegrationAssociation(INSTANCE_ARN, WISDOM_ASSISTANT_ARN, 'WISDOM_ASSISTANT')
-            print("Connect Integration - Wisdom Assistant. Create Integration Association Response: ", connectWisdomAssistantIntegration)
-            if connectWisdomAssistantIntegration['status'] == "SUCCESS":
-                responseData["Connect_WisdomAssistant_IntegrationAssociationARN"] = connectWisdomAssistantIntegration['IntegrationAssociationArn']
-                responseData["Wisdom_Assistant_ARN"] = WISDOM_ASSISTANT_ARN
-        else:
-            print("Wisdom Assistant ARN not provided. Skipping Integration Association Creation.")
-
-        if len(WISDOM_KNOWLEDGE_BASE_ARN) > 0:
-            connectWisdomKnowledgeBaseIntegration = createIntegrationAssociation(INSTANCE_ARN, WISDOM_KNOWLEDGE_BASE_ARN, 'WISDOM_KNOWLEDGE_BASE')
-            print("Connect Integration - Wisdom KnowledgeBase. Create Integration Association Response: ", connectWisdomKnowledgeBaseIntegration)
-            if connectWisdomKnowledgeBaseIntegration['status'] == "SUCCESS":
-                responseData["Connect_WisdomKnowledgeBase_IntegrationAssociationARN"] = connectWisdomKnowledgeBaseIntegration['IntegrationAssociationArn']
-                responseData["Wisdom_KnowledgeBase_ARN"] = WISDOM_KNOWLEDGE_BASE_ARN
-        else:
-            print("Wisdom KnowledgeBase ARN not provided. Skipping Integration Association Creation.")
+        # Integration Associations cannot be reconciled without the existing Integration Associations.
+        failedLists = [existing for existing in existingIntegrations.values() if isinstance(existing, dict)]
+        if failedLists:
+            print("Create/Update - Unable to list Integration Associations: ", failedLists[0]["Message"])
+            send(event, context, "FAILED", responseData, PHYSICAL_RESOURCE_ID, reason="Unable to list Integration Associations: " + failedLists[0]["Message"])
+            return responseData
+
+        # Step 2: Reconcile both Integration Types concurrently
+        with ThreadPoolExecutor(max_workers=len(INTEGRATION_TYPES)) as executor:
+            results = dict(zip(INTEGRATION_TYPES, executor.map(
+                lambda integrationType: reconcileIntegrationAssociation(INSTANCE_ARN, integrationType, event["ResourceProperties"][INTEGRATION_TYPES[integrationType]], existingIntegrations[integrationType]),
+                INTEGRATION_TYPES
+            )))
+        print("Connect Integration - Wisdom Assistant. Reconcile Integration Association Response: ", results["WISDOM_ASSISTANT"])
+        print("Connect Integration - Wisdom KnowledgeBase. Reconcile Integration Association Response: ", results["WISDOM_KNOWLEDGE_BASE"])
+
+        for integrationType, responseName, wisdomResourceName, integrationArn in (
+            ("WISDOM_ASSISTANT", "WisdomAssistant", "Assistant", WISDOM_ASSISTANT_ARN),
+            ("WISDOM_KNOWLEDGE_BASE", "WisdomKnowledgeBase", "KnowledgeBase", WISDOM_KNOWLEDGE_BASE_ARN)
+        ):
+            result = results[integrationType]
+            if result['status'] == "SUCCESS":
+                responseData["Connect_" + responseName + "_IntegrationAssociationARN"] = result['IntegrationAssociationArn']
+                responseData["Wisdom_" + wisdomResourceName + "_ARN"] = integrationArn
+            # Return replaced Integration Association Data
+            if result.get('Replaced'):
+                responseData["Previous_Connect_" + responseName + "_IntegrationAssociation"] = str(result['Replaced'][0])
+                responseData["Previous_Wisdom_" + wisdomResourceName + "_ARN"] = str(result['Replaced'][0]['IntegrationArn'])
 
         # Send CFN Response
+        failedResults = [result for result in results.values() if result['status'] in FAILED_STATUSES]
         print("Create/Update - Wisdom Integration Handler Response: ", json.dumps(responseData))
-        send(event, context, "SUCCESS", responseData, PHYSICAL_RESOURCE_ID)
+        if failedResults:
+            send(event, context, "FAILED", responseData, PHYSICAL_RESOURCE_ID, reason=failedResults[0]["Message"])
+        else:
+            send(event, context, "SUCCESS", responseData, PHYSICAL_RESOURCE_ID)
         return responseData
     
     # CloudFormation Stack sends DELETE signal - Delete Connect Integration Associations.
     # DELETE - ORDER OF OPERATIONS: 1) Connect-Assistant Integration, 2) Connect-Knowledgebase Integration, 3) Wisdom Assistant-Knowledgebase Association, 4) Wisdom Assistant, 5) Wisdom Knowledgebase
     if event["RequestType"] == "Delete":
-        # Case 1: If the Connect Instance has Wisdom Integration Associations (WISDOM_ASSISTANT, WISDOM_KNOWLEDGE_BASE), delete resources.
-        if len(connectWisdomAssistantIntegration):
-            response = deleteIntegrationAssociation(INSTANCE_ARN, connectWisdomAssistantIntegration[0]["IntegrationAssociationId"])
-            print("Connect Integration - Wisdom Assistant. Delete Integration Association Response: ", str(response))
-
-        if len(connectWisdomKnowledgeBaseIntegration):
-            response = deleteIntegrationAssociation(INSTANCE_ARN, connectWisdomKnowledgeBaseIntegration[0]["IntegrationAssociationId"])
-            print("Connect Integration - Wisdom KnowledgeBase. Delete Integration Association Response: ", str(response))
+        # Case 1: Delete the Wisdom Integration Associations (WISDOM_ASSISTANT, WISDOM_KNOWLEDGE_BASE) of the Wisdom resources of this stack, concurrently.
+        # Integration Associations with other Wisdom resources are not deleted.
+        stackIntegrations = [
+            association
+            for integrationType, propertyName in INTEGRATION_TYPES.items() if not isinstance(existingIntegrations[integrationType], dict)
+            for association in existingIntegrations[integrationType] if association["IntegrationArn"] == event["ResourceProperties"][propertyName]
+        ]
+        for response in deleteIntegrationAssociations(INSTANCE_ARN, stackIntegrations):
+            print("Connect Integration - Delete Integration Association Response: ", str(response))
         
         # Send CFN Response
         print("Delete - Wisdom Integration Handler Response: ", json.dumps(responseData))
         send(event, context, "SUCCESS", responseData, PHYSICAL_RESOURCE_ID)
         return responseData
 
-# List Amazon Connect Instance Integration Associations (Accepts either Instance ID or ARN)
+# Reconcile the Integration Associations of an Integration Type with the desired Wisdom resource ARN.
+# - An Integration Association with the desired ARN exists: no Integration Association is created. Other Integration Associations of the type are deleted.
+# - Otherwise, the new Integration Association is created before the existing ones are deleted, so agents keep Wisdom during the update.
+#   If Amazon Connect does not allow a second Integration Association of the type (DuplicateResourceException), the existing
+#   ones are deleted first. Any other create error is returned and the existing Integration Associations are kept.
+# - No ARN provided: existing Integration Associations are left unchanged.
+# Returns {'status', 'IntegrationAssociationArn', 'Replaced': [deleted Integration Associations], 'Changed': bool}
+def reconcileIntegrationAssociation(instanceId, integrationType, integrationArn, existingAssociations):
+    if not integrationArn:
+        print(integrationType, " ARN not provided. Skipping Integration Association.")
+        return {'status': "SKIPPED", 'Message': integrationType + " ARN not provided", 'Changed': False}
+
+    matchingAssociations = [association for association in existingAssociations if association["IntegrationArn"] == integrationArn]
+    replacedAssociations = [association for association in existingAssociations if association["IntegrationArn"] != integrationArn]
+    if matchingAssociations:
+        print("Connect Instance: ", instanceId, " is already integrated with ", integrationArn)
+        integrationAssociationArn = matchingAssociations[0]["IntegrationAssociationArn"]
+    else:
+        response = createIntegrationAssociation(instanceId, integrationArn, integrationType)
+        if response['status'] in FAILED_STATUSES and response.get('ErrorCode') == "DuplicateResourceException" and replacedAssociations:
+            print("Create Integration Association failed, replacing the existing Integration Associations: ", response['Message'])
+            deleteResponses = [deleteResponse for deleteResponse in deleteIntegrationAssociations(instanceId, replacedAssociations) if deleteResponse['status'] in FAILED_STATUSES]
+            if deleteResponses:
+                return deleteResponses[0]
+            response = createIntegrationAssociation(instanceId, integrationArn, integrationType)
+            if response['status'] in FAILED_STATUSES:
+                return response
+            return {'status': "SUCCESS", 'IntegrationAssociationArn': response['IntegrationAssociationArn'], 'Replaced': replacedAssociations, 'Changed': True}
+        if response['status'] in FAILED_STATUSES:
+            return response
+        integrationAssociationArn = response['IntegrationAssociationArn']
+
+    deleteResponses = [deleteResponse for deleteResponse in deleteIntegrationAssociations(instanceId, replacedAssociations) if deleteResponse['status'] in FAILED_STATUSES]
+    if deleteResponses:
+        return deleteResponses[0]
+    return {'status': "SUCCESS", 'IntegrationAssociationArn': integrationAssociationArn, 'Replaced': replacedAssociations, 'Changed': bool(replacedAssociations) or not matchingAssociations}
+
+# List Amazon Connect Instance Integration Associations (Accepts either Instance ID or ARN), all pages.
 # https://docs.aws.amazon.com/connect/latest/APIReference/API_ListIntegrationAssociations.html
 def listIntegrationAssociations(instanceId, integrationType):
-    CONNECT_CLIENT = boto3.client('connect')
     try:
-        response = CONNECT_CLIENT.list_integration_associations(
-            InstanceId=instanceId,
-            IntegrationType=integrationType
-        )
-        return response["IntegrationAssociationSummaryList"]
+        integrationAssociations = []
+        request = {"InstanceId": instanceId, "IntegrationType": integrationType, "MaxResults": 100}
+        while True:
+            response = CONNECT_CLIENT.list_integration_associations(**request)
+            integrationAssociations.extend(response["IntegrationAssociationSummaryList"])
+            if not response.get("NextToken"):
+                return integrationAssociations
+            request["NextToken"] = response["NextToken"]
     except ClientError as e:
         print(e)
         return {'status': "CLIENT_ERROR", 'Message': str(e)}
@@ -141,11 +189,11 @@ def createIntegrationAssociation(instanceId, integrationArn, integrationType):
         response["status"] = "SUCCESS"
         return response
     except ClientError as e:
-        return {'status': "CLIENT_ERROR", 'Message': str(e)}
+        return {'status': "CLIENT_ERROR", 'Message': str(e), 'ErrorCode': e.response["Error"]["Code"]}
     except Exception as ex:
         return {'status': "EXCEPTION", 'Message': str(ex)}
 
-# Delete a Connect - Wisdom Integration Association (Assistant or KnowledgeBase)
+# Delete a Connect - Wisdom Integration Association (Assistant or KnowledgeBase). An Integration Association that no longer exists is already deleted.
 # https://docs.aws.amazon.com/connect/latest/APIReference/API_DeleteIntegrationAssociation.html
 def deleteIntegrationAssociation(instanceId, integrationAssociationId):
     print("Deleting Integration Association between Connect Instance: ", instanceId, " and the Wisdom Resource: ", integrationAssociationId)
@@ -153,10 +201,19 @@ def deleteIntegrationAssociation(instanceId, integrationAssociationId):
         CONNECT_CLIENT.delete_integration_association(InstanceId=instanceId, IntegrationAssociationId=integrationAssociationId)
         return {'status': "SUCCESS", 'Message': str("Integration Association, " + integrationAssociationId + ", deleted successfully")}
     except ClientError as e:
+        if e.response["Error"]["Code"] == "ResourceNotFoundException":
+            return {'status': "SUCCESS", 'Message': str("Integration Association, " + integrationAssociationId + ", does not exist")}
         return {'status': "CLIENT_ERROR", 'Message': str(e)}
     except Exception as ex:
         return {'status': "EXCEPTION", 'Message': str(ex)}
 
+# Delete Integration Associations concurrently. Returns the delete responses.
+def deleteIntegrationAssociations(instanceId, integrationAssociations):
+    if not integrationAssociations:
+        return []
+    with ThreadPoolExecutor(max_workers=len(integrationAssociations)) as executor:
+        return list(executor.map(lambda association: deleteIntegrationAssociation(instanceId, association["IntegrationAssociationId"]), integrationAssociations))
+
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: MIT-0
 # CloudFormation Response Helper Function: https://docs.aws.amazon.com/AWSCloudFormation/latest/UserGuide/cfn-lambda-function-code-cfnresponsemodule.html
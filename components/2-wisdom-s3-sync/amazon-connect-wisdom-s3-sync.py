@@ -2,143 +2,1621 @@
 # SPDX-License-Identifier: MIT-0
 
 # Python Imports - License: https://docs.python.org/3/license.html
+import io
 import os
+import re
 import json
+import html
+import hashlib
+import sys
+import time
+import random
 import urllib3 
-from urllib.parse import unquote_plus
-http = urllib3.PoolManager()
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from html.parser import HTMLParser
+from urllib.parse import quote_plus, unquote_plus
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# AWS Lambda Environment Variables
+# Default Wisdom KnowledgeBase, for objects that match no route in KNOWLEDGE_BASE_ROUTES (optional when every object is routed).
+KNOWLEDGE_BASE_ARN = os.getenv('KNOWLEDGE_BASE_ARN', '')
+KNOWLEDGE_BASE_ID = KNOWLEDGE_BASE_ARN.split('/')[-1]
+# Knowledge Base routing table (JSON): S3 key prefix/suffix (and optional bucket) -> Wisdom KnowledgeBase, with optional
+# per-KnowledgeBase rate limits. Ex. [{"prefix": "sales/", "knowledgeBaseArn": "arn:aws:wisdom:...", "rateLimit": 5}]
+KNOWLEDGE_BASE_ROUTES = os.getenv('KNOWLEDGE_BASE_ROUTES', '')
+# Maximum number of S3 objects synchronized concurrently within a single invocation.
+MAX_CONCURRENCY = max(1, int(os.getenv('MAX_CONCURRENCY', '8')))
+# Objects larger than this size (bytes) are streamed from Amazon S3 to the Wisdom upload URL instead of read into memory.
+STREAMING_UPLOAD_THRESHOLD_BYTES = int(os.getenv('STREAMING_UPLOAD_THRESHOLD_BYTES', str(1024 * 1024)))
+# Size of each chunk (bytes) read from the S3 StreamingBody while streaming an upload.
+UPLOAD_CHUNK_SIZE_BYTES = int(os.getenv('UPLOAD_CHUNK_SIZE_BYTES', str(256 * 1024)))
+# Content Index (S3 Key -> Wisdom contentId/revisionId/ETag): optional DynamoDB table name and in-memory LRU cache size.
+CONTENT_INDEX_TABLE = os.getenv('CONTENT_INDEX_TABLE', '')
+CONTENT_INDEX_CACHE_SIZE = int(os.getenv('CONTENT_INDEX_CACHE_SIZE', '10000'))
+# Reconciliation: Amazon S3 Bucket to reconcile, object key suffixes to synchronize, and time (ms) reserved to return the continuation state.
+S3_BUCKET_NAME = os.getenv('S3_BUCKET_NAME', '')
+SYNC_KEY_SUFFIXES = tuple(suffix.strip() for suffix in os.getenv('SYNC_KEY_SUFFIXES', '.html,.pdf,.docx,.doc,.md').split(',') if suffix.strip())
+RECONCILE_TIME_RESERVE_MS = int(os.getenv('RECONCILE_TIME_RESERVE_MS', '15000'))
+# Reconciliation: number of items of a page (up to 1000 S3 keys) reconciled between two checks of the remaining time.
+RECONCILE_SLICE_SIZE = max(1, int(os.getenv('RECONCILE_SLICE_SIZE', '25')))
+# Content transforms applied before upload, in order (Ex. "markdown,html"; empty disables transforms), the maximum object size (bytes)
+# transformed (larger objects are streamed unchanged), and the size (bytes) of the in-memory cache of transformed content.
+# Transforms buffer the whole object (several copies while decoding), so they never apply above STREAMING_UPLOAD_THRESHOLD_BYTES.
+CONTENT_TRANSFORMS = tuple(name.strip() for name in os.getenv('CONTENT_TRANSFORMS', 'markdown,html').split(',') if name.strip())
+TRANSFORM_MAX_BYTES = min(int(os.getenv('TRANSFORM_MAX_BYTES', str(STREAMING_UPLOAD_THRESHOLD_BYTES))), STREAMING_UPLOAD_THRESHOLD_BYTES)
+TRANSFORM_CACHE_MAX_BYTES = int(os.getenv('TRANSFORM_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+# Content chunking: mode ("heading", "size"; empty disables chunking), objects larger than CHUNKING_THRESHOLD_BYTES are chunked,
+# maximum chunk size (bytes), deepest heading level that starts a chunk ("heading" mode), and chunks uploaded concurrently per object.
+# Chunking holds the object in memory (about 6 times its size while splitting and uploading): objects larger than
+# CHUNKING_MAX_SOURCE_BYTES are streamed to Wisdom unchanged, and at most CHUNKING_CONCURRENCY objects are chunked at once.
+CHUNKING_MODE = os.getenv('CHUNKING_MODE', '').strip().lower()
+CHUNKING_THRESHOLD_BYTES = int(os.getenv('CHUNKING_THRESHOLD_BYTES', str(1024 * 1024)))
+CHUNKING_MAX_SOURCE_BYTES = int(os.getenv('CHUNKING_MAX_SOURCE_BYTES', str(4 * 1024 * 1024)))
+CHUNKING_CONCURRENCY = max(1, int(os.getenv('CHUNKING_CONCURRENCY', '2')))
+CHUNK_MAX_BYTES = int(os.getenv('CHUNK_MAX_BYTES', str(256 * 1024)))
+CHUNK_HEADING_LEVEL = min(6, max(1, int(os.getenv('CHUNK_HEADING_LEVEL', '2'))))
+CHUNK_UPLOAD_CONCURRENCY = max(1, int(os.getenv('CHUNK_UPLOAD_CONCURRENCY', '4')))
+# Dead-letter queue replay: queue URL, messages received and synchronized per round, default rate limit (messages/second),
+# and number of keys listed by a dry run.
+DLQ_QUEUE_URL = os.getenv('DLQ_QUEUE_URL', '')
+REPLAY_BATCH_SIZE = max(1, int(os.getenv('REPLAY_BATCH_SIZE', '50')))
+REPLAY_RATE_LIMIT = float(os.getenv('REPLAY_RATE_LIMIT', '20'))
+REPLAY_REPORT_MAX_KEYS = int(os.getenv('REPLAY_REPORT_MAX_KEYS', '100'))
+# Bulk deletes: minimum number of removed keys (per KnowledgeBase, not in the Content Index) in a batch to resolve them with Wisdom ListContents.
+BULK_DELETE_MIN_KEYS = max(1, int(os.getenv('BULK_DELETE_MIN_KEYS', '20')))
+# Bulk deletes: maximum number of Wisdom ListContents pages (100 contents each) listed per KnowledgeBase and batch.
+BULK_DELETE_MAX_PAGES = max(1, int(os.getenv('BULK_DELETE_MAX_PAGES', '20')))
+# Wisdom API client-side rate limit (requests/second) per KnowledgeBase and operation, with optional per-operation overrides (Ex. {"SearchContent": 5}),
+# and the number of retries (with jittered exponential backoff) after a throttled request.
+WISDOM_API_RATE_LIMIT = float(os.getenv('WISDOM_API_RATE_LIMIT', '10'))
+WISDOM_API_RATE_LIMITS = json.loads(os.getenv('WISDOM_API_RATE_LIMITS') or '{}')
+WISDOM_API_MAX_RETRIES = int(os.getenv('WISDOM_API_MAX_RETRIES', '5'))
+# Create AWS SDK clients during the Lambda init phase instead of on first use.
+PREWARM_CLIENTS = os.getenv('PREWARM_CLIENTS', 'false').lower() == 'true'
+# Logging: minimum level (DEBUG, INFO, WARNING, ERROR), fraction of invocations logged at DEBUG, and fraction of
+# per-object summary lines emitted for objects that did not fail (failures are always logged).
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', '0'))
+LOG_OBJECT_SAMPLE_RATE = float(os.getenv('LOG_OBJECT_SAMPLE_RATE', '1'))
+# Amazon CloudWatch metrics (Embedded Metric Format): enable/disable and metric namespace.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+METRICS_NAMESPACE = os.getenv('METRICS_NAMESPACE', 'AmazonConnectWisdomS3Sync')
+
+# Connection pools are sized to MAX_CONCURRENCY so concurrent workers do not discard pooled connections.
+http = urllib3.PoolManager(maxsize=MAX_CONCURRENCY)
 
 # AWS SDK Imports
 import boto3
-from botocore.exceptions import ClientError
+from botocore.config import Config
+from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError, HTTPClientError
 
 AWS_REGION = os.environ["AWS_REGION"]
-CONNECT_CLIENT = boto3.client("connect", region_name=AWS_REGION)
-WISDOM_CLIENT = boto3.client("wisdom", region_name=AWS_REGION)
-S3_CLIENT = boto3.client('s3', region_name=AWS_REGION)
+# Adaptive retry mode adds client-side rate limiting on throttling responses. Connection pools are sized for MAX_CONCURRENCY workers.
+# Reference: https://boto3.amazonaws.com/v1/documentation/api/latest/guide/retries.html#adaptive-retry-mode
+BOTO_CONFIG = Config(retries={"mode": "adaptive", "max_attempts": 3}, max_pool_connections=MAX_CONCURRENCY, tcp_keepalive=True)
+# Wisdom requests are only retried by callWisdomApi (a single SDK attempt), so the Wisdom API rate limiters and the Throttles
+# metric see every throttled request. SDK retries underneath would absorb them (up to 3 attempts per callWisdomApi attempt).
+WISDOM_BOTO_CONFIG = BOTO_CONFIG.merge(Config(retries={"mode": "standard", "total_max_attempts": 1}))
 
-# AWS Lambda Environment Variables
-KNOWLEDGE_BASE_ARN = os.getenv('KNOWLEDGE_BASE_ARN')
-KNOWLEDGE_BASE_ID = KNOWLEDGE_BASE_ARN.split('/')[-1]
+# AWS SDK clients are created lazily on first use, then cached and reused by every invocation of a warm container.
+# Code paths that never call a service (Ex. deletes never call Amazon S3) never pay for creating its client.
+AWS_CLIENTS = {}
+AWS_CLIENTS_LOCK = threading.Lock()
+
+# Cached AWS SDK client (Ex. "wisdom", "s3") or resource (Ex. "resource:dynamodb"). Creation is serialized, boto3 sessions are not thread safe.
+def getAwsClient(serviceName):
+    client = AWS_CLIENTS.get(serviceName)
+    if client is None:
+        with AWS_CLIENTS_LOCK:
+            client = AWS_CLIENTS.get(serviceName)
+            if client is None:
+                if serviceName.startswith("resource:"):
+                    client = boto3.resource(serviceName.split(":", 1)[1], region_name=AWS_REGION, config=BOTO_CONFIG)
+                else:
+                    client = boto3.client(serviceName, region_name=AWS_REGION, config=WISDOM_BOTO_CONFIG if serviceName == "wisdom" else BOTO_CONFIG)
+                AWS_CLIENTS[serviceName] = client
+    return client
+
+# Pre-warm the client cache (PREWARM_CLIENTS=true): clients are created during the Lambda init phase, which runs with
+# full CPU, instead of adding latency to the first event after a cold start.
+def prewarmAwsClients():
+    for serviceName in ("wisdom", "s3"):
+        getAwsClient(serviceName)
+    if CONTENT_INDEX_TABLE:
+        getAwsClient("resource:dynamodb")
+
+#####################################################
+# Structured Logging: one compact JSON object per line, gated by LOG_LEVEL.
+# Each synchronized object emits a single INFO summary line (key, action, status, durations). Full payloads (events,
+# API responses) are only logged at DEBUG, and log fields are only serialized when their level is enabled.
+# Reference: https://docs.aws.amazon.com/lambda/latest/dg/python-logging.html
+#####################################################
+LOG_LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+# Effective level of the current invocation: LOG_LEVEL, or DEBUG for invocations sampled by LOG_DEBUG_SAMPLE_RATE.
+LOG_STATE = {"level": LOG_LEVELS.get(LOG_LEVEL, LOG_LEVELS["INFO"]), "requestId": None}
+# Stage durations (ms) of the object synchronized by the current worker thread, reported on its summary line.
+OBJECT_TRACE = threading.local()
+
+def startInvocationLogging(context):
+    debugSampled = random.random() < LOG_DEBUG_SAMPLE_RATE
+    LOG_STATE["level"] = LOG_LEVELS["DEBUG"] if debugSampled else LOG_LEVELS.get(LOG_LEVEL, LOG_LEVELS["INFO"])
+    LOG_STATE["requestId"] = getattr(context, "aws_request_id", None)
+
+def isLogEnabled(level):
+    return LOG_LEVELS[level] >= LOG_STATE["level"]
+
+# Ex. log("INFO", "Batch complete", messages=10) -> {"level":"INFO","message":"Batch complete","requestId":"...","messages":10}
+def log(level, message, **fields):
+    if not isLogEnabled(level):
+        return
+    record = {"level": level, "message": message, "requestId": LOG_STATE["requestId"]}
+    record.update(fields)
+    # A single write per line, so lines from concurrent workers are not interleaved.
+    sys.stdout.write(json.dumps(record, default=str, separators=(",", ":")) + "\n")
+
+# Time a stage (Ex. "head_object", "upload_content") of the object synchronized by the current thread.
+# Every stage is also recorded as a StageLatency metric, with the stage as the Operation dimension.
+@contextmanager
+def traceStage(stage, knowledgeBaseId=None):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        durationMs = (time.perf_counter() - start) * 1000
+        METRICS.put("StageLatency", durationMs, "Milliseconds", operation=stage, knowledgeBaseId=knowledgeBaseId or getattr(OBJECT_TRACE, "knowledgeBaseId", None))
+        durations = getattr(OBJECT_TRACE, "durations", None)
+        if durations is not None:
+            durations[stage] = round(durations.get(stage, 0) + durationMs, 1)
+
+# Synchronize a single object (syncFunction(*args)) routed to knowledgeBaseId and emit its summary line.
+# Results of None (nothing to do) are not logged.
+def traceObjectSync(knowledgeBaseId, bucket, key, eventName, syncFunction, *args, **summaryFields):
+    OBJECT_TRACE.durations = {}
+    OBJECT_TRACE.knowledgeBaseId = knowledgeBaseId
+    start = time.perf_counter()
+    try:
+        result = syncFunction(*args)
+    except Exception as ex:
+        result = {"status": "EXCEPTION", "data": str(ex)}
+    durationMs = round((time.perf_counter() - start) * 1000, 1)
+    stageDurations, OBJECT_TRACE.durations, OBJECT_TRACE.knowledgeBaseId = OBJECT_TRACE.durations, None, None
+    if result is None:
+        return result
+
+    failed = result["status"] in FAILED_STATUSES
+    METRICS.put("ObjectLatency", durationMs, "Milliseconds", knowledgeBaseId=knowledgeBaseId)
+    METRICS.put(objectResultMetric(result), 1, "Count", knowledgeBaseId=knowledgeBaseId)
+    if failed or isLogEnabled("DEBUG") or random.random() < LOG_OBJECT_SAMPLE_RATE:
+        summary = {"knowledgeBaseId": knowledgeBaseId, "bucket": bucket, "key": key, "event": eventName, "action": result.get("action"), "status": result["status"], "durationMs": durationMs, "stages": stageDurations}
+        if result["status"] != "SUCCESS":
+            summary["detail"] = result["data"]
+        summary.update(summaryFields)
+        log("ERROR" if failed else "INFO", "Object synchronization failed" if failed else "Object synchronized", **summary)
+    return result
+
+# Map an object result to its counter metric (ObjectsCreated/Updated/Deleted/Skipped/Failed).
+def objectResultMetric(result):
+    if result["status"] in FAILED_STATUSES:
+        return "ObjectsFailed"
+    return {"CREATE": "ObjectsCreated", "UPDATE": "ObjectsUpdated", "DELETE": "ObjectsDeleted"}.get(result.get("action"), "ObjectsSkipped")
+
+#####################################################
+# Amazon CloudWatch Metrics (Embedded Metric Format): metrics are aggregated during an invocation and written to the log
+# as EMF documents when it completes, CloudWatch extracts them without PutMetricData calls.
+# - Counters (Count, Bytes) are summed. Latencies (Milliseconds) keep every value, up to 100 values per document.
+# - Metrics of an object or operation use the KnowledgeBaseId the object is routed to (default: KNOWLEDGE_BASE_ARN).
+#   Metrics with an operation (Ex. StageLatency, Throttles) add the Operation dimension.
+# Reference: https://docs.aws.amazon.com/AmazonCloudWatch/latest/monitoring/CloudWatch_Embedded_Metric_Format_Specification.html
+#####################################################
+class EmfMetrics:
+    MAX_VALUES_PER_METRIC = 100
+
+    def __init__(self, namespace, dimensions, enabled=True):
+        self.namespace = namespace
+        self.dimensions = dimensions
+        self.enabled = enabled
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def put(self, name, value, unit, operation=None, knowledgeBaseId=None):
+        if not self.enabled:
+            return
+        with self.lock:
+            metric = self.metrics.setdefault((knowledgeBaseId, operation, name), {"unit": unit, "values": []})
+            if unit == "Milliseconds":
+                metric["values"].append(round(value, 1))
+            elif metric["values"]:
+                metric["values"][0] += value
+            else:
+                metric["values"].append(value)
+
+    # Write the aggregated metrics as EMF documents (one or more per KnowledgeBase and operation) and reset them.
+    def flush(self):
+        with self.lock:
+            metrics, self.metrics = self.metrics, {}
+        operations = {}
+        for (knowledgeBaseId, operation, name), metric in metrics.items():
+            operations.setdefault((knowledgeBaseId, operation), {})[name] = metric
+        timestamp = int(time.time() * 1000)
+        for (knowledgeBaseId, operation), operationMetrics in operations.items():
+            dimensions = dict(self.dimensions)
+            if knowledgeBaseId:
+                dimensions["KnowledgeBaseId"] = knowledgeBaseId
+            if operation:
+                dimensions["Operation"] = operation
+            documentCount = max((len(metric["values"]) - 1) // self.MAX_VALUES_PER_METRIC + 1 for metric in operationMetrics.values())
+            for document in range(documentCount):
+                window = slice(document * self.MAX_VALUES_PER_METRIC, (document + 1) * self.MAX_VALUES_PER_METRIC)
+                values = {name: metric["values"][window] for name, metric in operationMetrics.items() if metric["values"][window]}
+                emfDocument = {
+                    "_aws": {
+                        "Timestamp": timestamp,
+                        "CloudWatchMetrics": [{
+                            "Namespace": self.namespace,
+                            "Dimensions": [list(dimensions)],
+                            "Metrics": [{"Name": name, "Unit": operationMetrics[name]["unit"]} for name in values]
+                        }]
+                    },
+                    **dimensions,
+                    **{name: value[0] if len(value) == 1 else value for name, value in values.items()}
+                }
+                sys.stdout.write(json.dumps(emfDocument, separators=(",", ":")) + "\n")
+
+METRICS = EmfMetrics(METRICS_NAMESPACE, {"KnowledgeBaseId": KNOWLEDGE_BASE_ID} if KNOWLEDGE_BASE_ID else {}, enabled=METRICS_ENABLED)
+
+# Queue metrics of an SQS Message (timestamps are epoch milliseconds):
+# - QueueWaitTime: time in the queue before the first delivery (ApproximateFirstReceiveTimestamp - SentTimestamp)
+# - MessageAge: time since the message was sent, when the batch was received. Alarm on this metric to detect synchronization lag.
+def putQueueMetrics(sqsRecord, receivedTimestamp):
+    attributes = sqsRecord.get("attributes", {})
+    sentTimestamp = attributes.get("SentTimestamp")
+    firstReceiveTimestamp = attributes.get("ApproximateFirstReceiveTimestamp")
+    if sentTimestamp and firstReceiveTimestamp:
+        METRICS.put("QueueWaitTime", max(0, int(firstReceiveTimestamp) - int(sentTimestamp)), "Milliseconds")
+    if sentTimestamp:
+        METRICS.put("MessageAge", max(0, receivedTimestamp - int(sentTimestamp)), "Milliseconds")
+
+#####################################################
+# Knowledge Base Routing: S3 Object (bucket, key prefix/suffix) -> Wisdom KnowledgeBase
+# One sync pipeline serves many knowledge bases (Ex. one per line of business in a multi-tenant bucket). The routing table
+# (KNOWLEDGE_BASE_ROUTES) is parsed once per container, routes are matched in order and the first match wins. Each
+# KnowledgeBase has its own Wisdom API rate limiters, optionally sized by its route ("rateLimit", "rateLimits").
+#####################################################
+def loadKnowledgeBaseRoutes(routesJson):
+    routes = []
+    for route in json.loads(routesJson or '[]'):
+        routes.append({
+            "bucket": route.get("bucket"),
+            "prefix": route.get("prefix", ""),
+            "suffix": route.get("suffix", ""),
+            "knowledgeBaseId": (route.get("knowledgeBaseArn") or route["knowledgeBaseId"]).split('/')[-1],
+            "rateLimit": route.get("rateLimit"),
+            "rateLimits": route.get("rateLimits", {})
+        })
+    return routes
+
+KNOWLEDGE_BASE_ROUTE_TABLE = loadKnowledgeBaseRoutes(KNOWLEDGE_BASE_ROUTES)
+
+# Wisdom KnowledgeBase ID of an S3 Object: the first matching route, else the default KnowledgeBase (None if not set).
+def routeKnowledgeBase(bucket, key):
+    for route in KNOWLEDGE_BASE_ROUTE_TABLE:
+        if route["bucket"] in (None, bucket) and key.startswith(route["prefix"]) and key.endswith(route["suffix"]):
+            return route["knowledgeBaseId"]
+    return KNOWLEDGE_BASE_ID or None
+
+# Every KnowledgeBase ID objects can be routed to, in routing table order, followed by the default KnowledgeBase.
+def routedKnowledgeBaseIds():
+    knowledgeBaseIds = [route["knowledgeBaseId"] for route in KNOWLEDGE_BASE_ROUTE_TABLE] + ([KNOWLEDGE_BASE_ID] if KNOWLEDGE_BASE_ID else [])
+    return list(OrderedDict.fromkeys(knowledgeBaseIds))
+
+# Route of a KnowledgeBase (the first route that targets it), None for the default KnowledgeBase.
+def knowledgeBaseRoute(knowledgeBaseId):
+    return next((route for route in KNOWLEDGE_BASE_ROUTE_TABLE if route["knowledgeBaseId"] == knowledgeBaseId), None)
+
+# Result statuses that mark an S3 record (and the SQS message containing it) as failed, so the message is redelivered.
+FAILED_STATUSES = ("CLIENT_ERROR", "EXCEPTION")
+# Wisdom error codes returned when a cached contentId/revisionId no longer matches the Wisdom KnowledgeBase.
+STALE_CONTENT_ERRORS = ("PreconditionFailedException", "ResourceNotFoundException")
 
 # This AWS Lambda function will handle the synchronization of Amazon S3 files with Amazon Connect Wisdom
 # This main function triggered by an SQS event (S3 Event Notification -> SQS)
+# Every SQS message in the batch (and every S3 record inside each message) is processed. Messages that fail are returned
+# as batchItemFailures, so only those messages are redelivered by SQS instead of the whole batch.
+# Reference: https://docs.aws.amazon.com/lambda/latest/dg/with-sqs.html#services-sqs-batchfailurereporting
+# S3 objects are synchronized concurrently (up to MAX_CONCURRENCY workers). Records for the same object key are
+# coalesced, so only the latest event for each key (by S3 sequencer) is synchronized.
+# Messages that fail maxReceiveCount times are moved to the dead-letter queue (redrive policy), see replayDeadLetterQueue.
 def lambda_handler(event, context):
-    # Initially, event is a dictionary. Use json.dumps(x) to convert JSON -> String. Use json.loads(x) to convert String -> JSON
-    print("Event Recieved (String): ", json.dumps(event))
-    print("KnowledgeBase ARN: ", KNOWLEDGE_BASE_ARN)
+    startInvocationLogging(context)
+    log("DEBUG", "Event received", knowledgeBaseArn=KNOWLEDGE_BASE_ARN, routes=len(KNOWLEDGE_BASE_ROUTE_TABLE), event=event)
+
+    # Direct invocation: Full Bucket Reconciliation / Backfill (Ex. {"action": "RECONCILE"})
+    if event.get("action") == "RECONCILE":
+        return reconcileKnowledgeBase(event, context)
+    # Direct invocation: Dead-Letter Queue Replay (Ex. {"action": "REPLAY_DLQ", "dryRun": true})
+    if event.get("action") == "REPLAY_DLQ":
+        return replayDeadLetterQueue(event, context)
+
+    failedMessageIds, objectCount = syncSQSMessages(event["Records"])
+
+    # Preserve the original SQS Message order in the batch response
+    batchItemFailures = [{"itemIdentifier": sqsRecord["messageId"]} for sqsRecord in event["Records"] if sqsRecord["messageId"] in failedMessageIds]
+    log("INFO", "Batch complete", messages=len(event["Records"]), objects=objectCount, failedMessages=len(batchItemFailures))
+    METRICS.put("FailedMessages", len(batchItemFailures), "Count")
+    METRICS.flush()
+    return {"batchItemFailures": batchItemFailures}
+
+# Synchronize the S3 records of a batch of SQS Messages (SQS event records). Returns the IDs of the failed messages and the number of objects.
+def syncSQSMessages(sqsRecords, queueMetrics=True):
+    # Step 1: Parse every SQS Message, grouping S3 records by (bucket, key). Messages that cannot be parsed (or hold a malformed
+    # S3 record) are failed, without synchronizing any of their records.
+    failedMessageIds = set()
+    s3RecordsByKey = {}
+    receivedTimestamp = int(time.time() * 1000)
+    for sqsRecord in sqsRecords:
+        messageId = sqsRecord["messageId"]
+        if queueMetrics:
+            putQueueMetrics(sqsRecord, receivedTimestamp)
+        try:
+            s3Records = []
+            for s3EventBody in parseSQSRecord(sqsRecord):
+                if not isinstance(s3EventBody.get("eventName"), str):
+                    raise ValueError("S3 record without eventName")
+                s3Object = s3EventBody["s3"]
+                s3Records.append(((s3Object["bucket"]["name"], unquote_plus(s3Object["object"]["key"])), s3EventBody))
+            for objectKey, s3EventBody in s3Records:
+                s3RecordsByKey.setdefault(objectKey, []).append((messageId, s3EventBody))
+        except Exception as ex:
+            log("ERROR", "Failed to parse SQS message", messageId=messageId, error=str(ex))
+            failedMessageIds.add(messageId)
+
+    # Step 2: Resolve the Wisdom Content of bulk deletes (Ex. a removed S3 prefix) with a single Wisdom ListContents pass.
+    resolvedContents = resolveRemovedContents(s3RecordsByKey)
+    bulkDeleteCounts = {"deleted": 0, "missing": 0, "failed": 0}
+
+    # Step 3: Synchronize S3 objects concurrently. Report the SQS Message as failed if any S3 record inside of it failed.
+    if len(s3RecordsByKey):
+        with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENCY, len(s3RecordsByKey))) as executor:
+            futures = {executor.submit(syncS3Records, records, resolvedContents.get(objectKey)): objectKey for objectKey, records in s3RecordsByKey.items()}
+            for future in as_completed(futures):
+                results = future.result()
+                for messageId, result in results:
+                    if result["status"] == "SUPERSEDED":
+                        METRICS.put("EventsSuperseded", 1, "Count")
+                    if result["status"] in FAILED_STATUSES:
+                        log("WARNING", "SQS message failed", messageId=messageId, status=result["status"])
+                        failedMessageIds.add(messageId)
+                # The result of the latest record for the key is the last one
+                if futures[future] in resolvedContents:
+                    bulkDeleteCounts[bulkDeleteResultCount(results[-1][1])] += 1
+
+    if resolvedContents:
+        log("INFO", "Bulk delete complete", keys=len(resolvedContents), **bulkDeleteCounts)
+        METRICS.put("DeletesMissing", bulkDeleteCounts["missing"], "Count")
+    return failedMessageIds, len(s3RecordsByKey)
+
+# Bulk delete fast path: when a batch removes at least BULK_DELETE_MIN_KEYS keys of a KnowledgeBase (Ex. an S3 prefix was
+# deleted) that are not in the Content Index, their Wisdom Content is resolved with Wisdom ListContents (100 contents per
+# call) instead of one Wisdom SearchContent call per key. The deletes are then issued concurrently by the sync workers,
+# paced by the DeleteContent rate limiter.
+# Returns {(bucket, key): existingContentResponse} for the resolved keys. Keys of a failed listing, and keys not found
+# within BULK_DELETE_MAX_PAGES pages, are looked up one by one (lookupWisdomContent).
+def resolveRemovedContents(s3RecordsByKey):
+    removedKeysByKnowledgeBase = {}
+    for (bucket, key), records in s3RecordsByKey.items():
+        if "ObjectRemoved" not in latestS3Record(records)[1].get("eventName", ""):
+            continue
+        knowledgeBaseId = routeKnowledgeBase(bucket, key)
+        if knowledgeBaseId is not None and not cachedContentIndexEntry(knowledgeBaseId, key):
+            removedKeysByKnowledgeBase.setdefault(knowledgeBaseId, set()).add((bucket, key))
+
+    resolvedContents = {}
+    for knowledgeBaseId, objectKeys in removedKeysByKnowledgeBase.items():
+        if len(objectKeys) < BULK_DELETE_MIN_KEYS:
+            continue
+        with traceStage("list_contents", knowledgeBaseId):
+            listedContents, listingComplete = listWisdomContentsByKey(knowledgeBaseId, objectKeys)
+        if listedContents is None:
+            continue
+        # A key missing from a complete listing does not exist in Wisdom
+        for objectKey in objectKeys:
+            if listingComplete or objectKey in listedContents:
+                resolvedContents[objectKey] = {"status": "SUCCESS", "data": listedContents.get(objectKey), "source": "LIST"}
+        log("INFO", "Bulk delete resolved with Wisdom ListContents", knowledgeBaseId=knowledgeBaseId, keys=len(objectKeys), found=len(listedContents), listingComplete=listingComplete)
+    return resolvedContents
+
+# Content Index entry of a Key, or None. A failed lookup (Ex. DynamoDB throttling) is an index miss, so it does not fail the
+# whole batch: the Key is resolved with Wisdom ListContents instead.
+def cachedContentIndexEntry(knowledgeBaseId, key):
+    try:
+        return CONTENT_INDEX.get(knowledgeBaseId, key)
+    except Exception as ex:
+        log("WARNING", "Content Index lookup failed, treating it as a miss", knowledgeBaseId=knowledgeBaseId, key=key, error=str(ex))
+        return None
 
+# Page through Wisdom ListContents (at most BULK_DELETE_MAX_PAGES pages) and return the Content Index entries of the given
+# (bucket, key) pairs, and whether the whole KnowledgeBase was listed. Chunked objects are returned with all of their chunks,
+# so they are only returned by a complete listing. Listing stops once every key is found (unless chunks were found, which
+# can span pages). Returns (None, False) if Wisdom ListContents fails.
+def listWisdomContentsByKey(knowledgeBaseId, objectKeys):
+    contents, chunks, nextToken = {}, {}, None
+    for pageCount in range(BULK_DELETE_MAX_PAGES):
+        page = wisdomListContents(knowledgeBaseId, nextToken)
+        if page["status"] in FAILED_STATUSES:
+            log("WARNING", "Bulk delete listing failed, looking up keys one by one", knowledgeBaseId=knowledgeBaseId, error=page["data"])
+            return None, False
+        for contentSummary in page["data"]:
+            metadata = contentSummary.get("metadata", {})
+            objectKey = (metadata.get("sourceS3Bucket"), metadata.get("sourceS3Key", contentSummary["name"]))
+            if objectKey not in objectKeys:
+                continue
+            if "chunkIndex" in metadata:
+                chunks.setdefault(objectKey, {})[int(metadata["chunkIndex"])] = contentSummary
+            else:
+                contents[objectKey] = contentIndexEntry(contentSummary, metadata)
+        nextToken = page.get("nextToken")
+        if not nextToken or (not chunks and len(contents) == len(objectKeys)):
+            break
+    else:
+        # Page budget exhausted: the remaining keys (and the partially listed chunked objects) are looked up one by one
+        log("INFO", "Bulk delete listing truncated, looking up remaining keys one by one", knowledgeBaseId=knowledgeBaseId, pages=BULK_DELETE_MAX_PAGES)
+        return {objectKey: indexEntry for objectKey, indexEntry in contents.items() if objectKey not in chunks}, False
+
+    for objectKey, chunkSummaries in chunks.items():
+        chunkEntries = [chunkIndexEntry(chunkSummaries[index]) for index in sorted(chunkSummaries)]
+        # An unchunked Wisdom Content left over for the same key is deleted with the chunks
+        if objectKey in contents:
+            chunkEntries.append(contents[objectKey])
+        contents[objectKey] = chunkedContentIndexEntry(chunkEntries, chunkSummaries[min(chunkSummaries)].get("metadata", {}))
+    return contents, True
+
+# Map the result of a bulk delete key to its counter (deleted/missing/failed)
+def bulkDeleteResultCount(result):
+    if result["status"] in FAILED_STATUSES:
+        return "failed"
+    return "deleted" if result.get("action") == "DELETE" else "missing"
+
+# Parse a single SQS Message (S3 Event Notification). Returns the list of S3 records in the message.
+def parseSQSRecord(sqsRecord):
     # Parse the SQS Event Body. (Initially, sqsEventBody is a string, needs json.loads() to convert to dictionary)
-    sqsEventBody = event["Records"][0]["body"] # print("SQS Event Body (String): ", sqsEventBody)
-    sqsEventBody = json.loads(sqsEventBody) # print("SQS Event Body (Dictionary): ", sqsEventBody)
+    sqsEventBody = json.loads(sqsRecord["body"])
 
     # Handle S3 Test Events
     if "Event" in sqsEventBody:
-        print("Amazon S3 -> SQS Event Recieved: ", sqsEventBody["Event"]) 
         if sqsEventBody["Event"] == "s3:TestEvent":
-            print("S3 Test Event Recieved, no action taken")
-            return
-        
-    # Parse Incoming SQS Event - S3 Event Notification
-    if "Records" in sqsEventBody:
-        s3EventBody = sqsEventBody["Records"][0]
-        # print("S3 Event Body (Dictionary): ", s3EventBody)
-        print("S3 Event Body (String): ", json.dumps(s3EventBody))
-        
-        eventName = s3EventBody["eventName"]
-        print("Amazon S3 -> SQS Event Recieved: ", eventName)
-        
-        s3Data = s3EventBody["s3"]
-        print("S3 Data: ", s3Data)
+            log("INFO", "S3 test event received, no action taken", messageId=sqsRecord["messageId"])
+            return []
 
-        # Step 2.1: Parse S3 Event Body
-        bucket = s3Data["bucket"]["name"]
-        
-        # Preprocess S3 Key from SQS Event to handle case where spaces exist in the file name
-        raw_key = s3Data["object"]["key"]
-        key = unquote_plus(raw_key) 
-        print("Original Key: ", raw_key, ", Parsed Key: ", key)
-        version = s3Data["object"]["versionId"]
-        print("Bucket: ", bucket, " Key: ", key, " Version: ", version)
-
-        # Search for existing Wisdom Content with the same Key
-        searchWisdomContentResponse = wisdomSearchContent(KNOWLEDGE_BASE_ID, key)["data"]
-        print("Existing Wisdom Content (Wisdom SearchContent): ", json.dumps(searchWisdomContentResponse))
-
-        # Handle S3 Bucket Object Notification Events (Create/Update/Delete)
-        # Case 1: S3 Event Type is ObjectCreated (Create/Update)
-        if "ObjectCreated" in eventName:
-            print("START processing S3:ObjectCreated")
-
-            # Get S3 Object for CREATE or UPDATE
-            # S3 Get Object API Reference: https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3/client/get_object.html#
-            s3GetObjectResponse = s3GetObject(bucket, key) # versionId=version
-            if len(s3GetObjectResponse) == 0:
-                print("Object: ", key, " does not exist in Amazon S3 bucket: ", bucket, " nothing to create/update")
-                return
-            
-            # If S3 Get Object Response is not None, then there is a valid object in the Amazon S3 Bucket with the provided Key.
-            # Upload S3 Object to Wisdom KnowledgeBase using Wisdom StartContentUpload API
-            wisdomStartContentUploadResponse = wisdomStartContentUpload(KNOWLEDGE_BASE_ID, s3GetObjectResponse)
-            print("START - Wisdom Content Upload Response: ", json.dumps(wisdomStartContentUploadResponse))
-            uploadId = wisdomStartContentUploadResponse["data"]
-
-            # Case 1.1: UPDATE - If there is an existing item found in the Wisdom KnowledgeBase, update it.
-            if len(searchWisdomContentResponse):
-                print("UPDATE - Object: ", key, " already exists in Wisdom KnowledgeBase, updating Wisdom content")
-                print("ExistingWisdomContent: ", searchWisdomContentResponse[0])
-                updateContentResponse = wisdomUpdateContent(knowledgeBaseId=KNOWLEDGE_BASE_ID, uploadId=uploadId, bucketName=bucket, objectKey=key, rawObjectKey=raw_key, existingWisdomContent=searchWisdomContentResponse)
-                responseData = json.dumps(updateContentResponse, sort_keys=True, default=str)
-                
-                # Return Response Data
-                print("SUCCESS - Wisdom UpdateContent Response: ", responseData)
-                return {"status": "SUCCESS", "data": responseData}
-            # CASE 1.2: CREATE - If there is no existing Wisdom Content for the S3 Object, create new Wisdom Content
-            else:
-                print("CREATE - Object: ", key, " does not exist in KnowledgeBase, creating Wisdom content")
-                createContentResponse = wisdomCreateContent(knowledgeBaseId=KNOWLEDGE_BASE_ID, uploadId=uploadId, bucketName=bucket, objectKey=key, rawObjectKey=raw_key)
-                responseData = json.dumps(createContentResponse, sort_keys=True, default=str)
-                
-                # Return Response Data
-                print("SUCCESS - Wisdom CreateContent Response: ", responseData)
-                return {"status": "SUCCESS", "data": responseData}
-
-        # Case 2: S3 Event Type is ObjectRemoved (Delete)
-        elif "ObjectRemoved" in eventName:
-            print("START processing S3:ObjectRemoved")
-            # Case 2.1: On DELETE - IF Object does exist in KnowledgeBase, process deletion
-            if len(searchWisdomContentResponse):
-                print("DELETE - Object: ", key, " exists in KnowledgeBase, deleting Wisdom content.")
-                print("START DeleteContent: ", searchWisdomContentResponse[0], " from KnowledgeBase: ", KNOWLEDGE_BASE_ID)
-                try:
-                    WISDOM_CLIENT.delete_content(
-                        knowledgeBaseId = KNOWLEDGE_BASE_ID,
-                        contentId = searchWisdomContentResponse[0]["contentId"],
-                    )
-                    print("SUCCESS - Wisdom DeleteContent Response: ", json.dumps(searchWisdomContentResponse[0]["title"]))
-                    return {"status": "SUCCESS", "data": "Wisdom Content Successfully Deleted"}
-                except ClientError as e:
-                    print("Client Error - Wisdom DeleteContent: ", str(e))
-                    return {"status": "CLIENT_ERROR", "data": str(e)}
-                except Exception as ex:
-                    print("Exception - Wisdom DeleteContent: ", str(ex))
-                    return {"status": "EXCEPTION", "data": str(ex)}
-
-            # Case 2.2: On DELETE - IF Object does NOT exist in KnowledgeBase, return None
+    # Parse Incoming SQS Event - S3 Event Notification (A single message may contain multiple S3 records)
+    return sqsEventBody.get("Records", [])
+
+# Coalesce the S3 records of a single object key: only the latest record (by S3 sequencer) is synchronized.
+# Returns a list of (messageId, result) tuples. Older records are reported as SUPERSEDED.
+# resolvedContent is the existing Wisdom Content of the key when it was resolved for the whole batch (bulk deletes).
+def syncS3Records(records, resolvedContent=None):
+    latestRecord = latestS3Record(records)
+    results = [(messageId, {"status": "SUPERSEDED", "data": "Superseded by a later event for the same key"}) for messageId, s3EventBody in records if s3EventBody is not latestRecord[1]]
+
+    # The summary line reports the number of coalesced events for the key.
+    messageId, s3EventBody = latestRecord
+    bucket = s3EventBody["s3"]["bucket"]["name"]
+    key = unquote_plus(s3EventBody["s3"]["object"]["key"])
+    knowledgeBaseId = routeKnowledgeBase(bucket, key)
+    # syncS3Record (guarded by traceObjectSync) reports a record without eventName as failed
+    result = traceObjectSync(knowledgeBaseId, bucket, key, s3EventBody.get("eventName", ""), syncS3Record, s3EventBody, knowledgeBaseId, resolvedContent, events=len(records))
+    results.append((messageId, result))
+    return results
+
+# Latest (messageId, s3EventBody) record of a key, by S3 sequencer
+def latestS3Record(records):
+    latestRecord = records[0]
+    for record in records[1:]:
+        if compareS3Sequencers(s3RecordSequencer(record[1]), s3RecordSequencer(latestRecord[1])) >= 0:
+            latestRecord = record
+    return latestRecord
+
+# S3 sequencer of an S3 Event Notification record ("" if not present).
+def s3RecordSequencer(s3EventBody):
+    return s3EventBody["s3"]["object"].get("sequencer") or ""
+
+# Compare two S3 sequencer values for the same key. Returns 1 if sequencerA is later, -1 if earlier, 0 if equal.
+# Sequencers can be of different lengths: right pad the shorter value with zeros, then compare lexicographically.
+# Reference: https://docs.aws.amazon.com/AmazonS3/latest/userguide/notification-content-structure.html
+def compareS3Sequencers(sequencerA, sequencerB):
+    width = max(len(sequencerA), len(sequencerB))
+    sequencerA = sequencerA.upper().ljust(width, "0")
+    sequencerB = sequencerB.upper().ljust(width, "0")
+    return (sequencerA > sequencerB) - (sequencerA < sequencerB)
+
+# Synchronize a single S3 Event Notification record with the Wisdom KnowledgeBase it is routed to (Create/Update/Delete)
+def syncS3Record(s3EventBody, knowledgeBaseId, resolvedContent=None):
+    log("DEBUG", "S3 record received", s3EventBody=s3EventBody)
+    eventName = s3EventBody["eventName"]
+    s3Data = s3EventBody["s3"]
+
+    # Step 2.1: Parse S3 Event Body
+    bucket = s3Data["bucket"]["name"]
+    
+    # Preprocess S3 Key from SQS Event to handle case where spaces exist in the file name
+    raw_key = s3Data["object"]["key"]
+    key = unquote_plus(raw_key) 
+    sequencer = s3RecordSequencer(s3EventBody)
+    if knowledgeBaseId is None:
+        return {"status": "SKIPPED", "data": "No Knowledge Base route for Key"}
+
+    # Look up existing Wisdom Content for the Key (Content Index first, Wisdom SearchContent on an index miss)
+    existingContentResponse = resolvedContent or lookupWisdomContent(knowledgeBaseId, key)
+    if existingContentResponse["status"] in FAILED_STATUSES:
+        return existingContentResponse
+    log("DEBUG", "Existing Wisdom content", key=key, source=existingContentResponse["source"], content=existingContentResponse["data"])
+
+    # Out-of-order protection: discard events that are not newer than the event already synchronized for this Key.
+    if isStaleEvent(key, sequencer, existingContentResponse["data"]):
+        return {"status": "SKIPPED", "data": "Stale event"}
+
+    # Handle S3 Bucket Object Notification Events (Create/Update/Delete)
+    # Case 1: S3 Event Type is ObjectCreated (Create/Update)
+    if "ObjectCreated" in eventName:
+        return syncObjectCreated(knowledgeBaseId, bucket, key, raw_key, sequencer, existingContentResponse)
+
+    # Case 2: S3 Event Type is ObjectRemoved (Delete)
+    elif "ObjectRemoved" in eventName:
+        return syncObjectRemoved(knowledgeBaseId, key, existingContentResponse, sequencer)
+
+    # Case 3: Unsupported S3 Event Type
+    else:
+        return {"status": "SKIPPED", "data": "Event not supported: " + eventName}
+
+# An event is stale if it is not newer (by S3 sequencer) than the event already synchronized for the Key (existingContent).
+def isStaleEvent(key, sequencer, existingContent):
+    syncedSequencer = (existingContent or {}).get("sequencer")
+    if sequencer and syncedSequencer and compareS3Sequencers(sequencer, syncedSequencer) <= 0:
+        log("DEBUG", "Stale event, not newer than the synchronized event", key=key, sequencer=sequencer, syncedSequencer=syncedSequencer)
+        return True
+    return False
+
+# S3:ObjectCreated - Create or Update Wisdom Content from the S3 Object, keeping the Content Index current.
+def syncObjectCreated(knowledgeBaseId, bucket, key, raw_key, sequencer, existingContentResponse):
+    # HEAD the S3 Object and compare its ETag with the fingerprint of the synchronized Wisdom Content.
+    # Metadata-only copies and re-uploads of identical bytes keep the same ETag, so no upload is needed.
+    s3HeadObjectResponse = s3HeadObject(bucket, key)
+    if s3HeadObjectResponse.get("status") in FAILED_STATUSES:
+        return s3HeadObjectResponse
+    if len(s3HeadObjectResponse) == 0:
+        return {"status": "SKIPPED", "data": "Object does not exist in Amazon S3"}
+    existingContent = existingContentResponse["data"]
+    if existingContent and existingContent.get("etag") == s3HeadObjectResponse.get("ETag"):
+        # Record the newer sequencer, so older events for this Key are still recognized as stale.
+        if sequencer:
+            CONTENT_INDEX.put(knowledgeBaseId, key, dict(existingContent, sequencer=sequencer))
+        return {"status": "SKIPPED", "data": "Object unchanged"}
+
+    # Content transformed from the same source ETag is reused without getting the S3 Object.
+    s3GetObjectResponse = cachedTransformedS3Object(key, s3HeadObjectResponse)
+    if s3GetObjectResponse is None:
+        # Get S3 Object for CREATE or UPDATE
+        # S3 Get Object API Reference: https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3/client/get_object.html#
+        s3GetObjectResponse = s3GetObject(bucket, key) # versionId=version
+        if s3GetObjectResponse.get("status") in FAILED_STATUSES:
+            return s3GetObjectResponse
+        if len(s3GetObjectResponse) == 0:
+            return {"status": "SKIPPED", "data": "Object does not exist in Amazon S3"}
+        s3GetObjectResponse = transformS3Object(key, s3GetObjectResponse)
+
+    # Large documents are synchronized as multiple Wisdom Contents (CHUNKING_MODE)
+    # At most CHUNKING_CONCURRENCY objects are held in memory for chunking at the same time.
+    if isChunkable(key, s3GetObjectResponse):
+        with CHUNKING_SEMAPHORE:
+            chunks = chunkS3Object(key, s3GetObjectResponse)
+            return syncObjectChunks(knowledgeBaseId, bucket, key, raw_key, sequencer, existingContent, s3GetObjectResponse, chunks)
+    
+    # If S3 Get Object Response is not None, then there is a valid object in the Amazon S3 Bucket with the provided Key.
+    # Upload S3 Object to Wisdom KnowledgeBase using Wisdom StartContentUpload API
+    wisdomStartContentUploadResponse = wisdomStartContentUpload(knowledgeBaseId, s3GetObjectResponse)
+    if wisdomStartContentUploadResponse["status"] in FAILED_STATUSES:
+        return wisdomStartContentUploadResponse
+    uploadId = wisdomStartContentUploadResponse["data"]
+
+    sourceFingerprint = s3ObjectFingerprint(s3GetObjectResponse, sequencer)
+    upsertContentResponse = upsertWisdomContent(knowledgeBaseId, uploadId, bucket, key, raw_key, existingContent, sourceFingerprint)
+
+    # A Content Index entry is stale if the content was revised or removed outside of this function. Refresh it with Wisdom SearchContent and retry once.
+    if upsertContentResponse.get("errorCode") in STALE_CONTENT_ERRORS and existingContentResponse["source"] == "INDEX":
+        log("INFO", "Content Index entry is stale, refreshing with Wisdom SearchContent", key=key, errorCode=upsertContentResponse["errorCode"])
+        CONTENT_INDEX.delete(knowledgeBaseId, key)
+        existingContentResponse = lookupWisdomContent(knowledgeBaseId, key)
+        if existingContentResponse["status"] in FAILED_STATUSES:
+            return existingContentResponse
+        # The content may have been revised by a newer event for the Key in the meantime
+        if isStaleEvent(key, sequencer, existingContentResponse["data"]):
+            return {"status": "SKIPPED", "data": "Stale event"}
+        upsertContentResponse = upsertWisdomContent(knowledgeBaseId, uploadId, bucket, key, raw_key, existingContentResponse["data"], sourceFingerprint)
+
+    if upsertContentResponse["status"] in FAILED_STATUSES:
+        return upsertContentResponse
+    CONTENT_INDEX.put(knowledgeBaseId, key, contentIndexEntry(upsertContentResponse["data"], sourceFingerprint))
+
+    # The object was previously chunked: its chunks are replaced by the new Wisdom Content
+    deleteResponse = deleteWisdomContents(knowledgeBaseId, (existingContentResponse["data"] or {}).get("chunks"))
+    if deleteResponse:
+        log("WARNING", "Previous chunks of the object were not deleted", key=key, error=deleteResponse["data"])
+
+    # Return Response Data (Wisdom Content)
+    return {"status": "SUCCESS", "action": upsertContentResponse["action"], "data": upsertContentResponse["data"]}
+
+# Case 1.1: UPDATE - If there is existing Wisdom Content for the S3 Object, update it.
+# CASE 1.2: CREATE - If there is no existing Wisdom Content for the S3 Object (or it was chunked), create new Wisdom Content
+# contentName and title are set for chunks (Ex. "<key>#chunk-0001"), the Wisdom Content name and title default to the Key.
+def upsertWisdomContent(knowledgeBaseId, uploadId, bucket, key, raw_key, existingContent, sourceFingerprint, contentName=None, title=None):
+    if existingContent and existingContent.get("contentId"):
+        response = wisdomUpdateContent(knowledgeBaseId=knowledgeBaseId, uploadId=uploadId, bucketName=bucket, objectKey=key, rawObjectKey=raw_key, existingWisdomContent=existingContent, sourceFingerprint=sourceFingerprint, title=title)
+        response["action"] = "UPDATE"
+    else:
+        response = wisdomCreateContent(knowledgeBaseId=knowledgeBaseId, uploadId=uploadId, bucketName=bucket, objectKey=key, rawObjectKey=raw_key, sourceFingerprint=sourceFingerprint, contentName=contentName, title=title)
+        response["action"] = "CREATE"
+    return response
+
+# S3:ObjectRemoved - Delete the Wisdom Content for the S3 Object, keeping the Content Index current.
+# sequencer is the S3 sequencer of the event (None for reconciliation), checked again after a Content Index refresh.
+def syncObjectRemoved(knowledgeBaseId, key, existingContentResponse, sequencer=None):
+    if existingContentResponse["status"] in FAILED_STATUSES:
+        return existingContentResponse
+
+    # Case 2.2: On DELETE - IF Object does NOT exist in KnowledgeBase, nothing to delete
+    if not existingContentResponse["data"]:
+        return {"status": "SKIPPED", "data": "Object does not exist in Wisdom KnowledgeBase"}
+
+    # Case 2.3: On DELETE - IF Object was chunked, delete every chunk
+    if existingContentResponse["data"].get("chunks"):
+        deleteContentResponse = deleteWisdomContents(knowledgeBaseId, existingContentResponse["data"]["chunks"])
+        if deleteContentResponse:
+            return deleteContentResponse
+        CONTENT_INDEX.delete(knowledgeBaseId, key)
+        return {"status": "SUCCESS", "action": "DELETE", "data": "Wisdom Content Successfully Deleted (%d chunks)" % len(existingContentResponse["data"]["chunks"])}
+
+    # Case 2.1: On DELETE - IF Object does exist in KnowledgeBase, process deletion
+    deleteContentResponse = wisdomDeleteContent(knowledgeBaseId, existingContentResponse["data"])
+
+    # Content Index entry is stale (content removed or replaced outside of this function). Refresh it with Wisdom SearchContent and retry once.
+    if deleteContentResponse.get("errorCode") == "ResourceNotFoundException" and existingContentResponse["source"] == "INDEX":
+        log("INFO", "Content Index entry is stale, refreshing with Wisdom SearchContent", key=key, errorCode=deleteContentResponse["errorCode"])
+        CONTENT_INDEX.delete(knowledgeBaseId, key)
+        existingContentResponse = lookupWisdomContent(knowledgeBaseId, key)
+        if existingContentResponse["status"] not in FAILED_STATUSES and isStaleEvent(key, sequencer, existingContentResponse["data"]):
+            return {"status": "SKIPPED", "data": "Stale event"}
+        return syncObjectRemoved(knowledgeBaseId, key, existingContentResponse)
+
+    if deleteContentResponse["status"] in FAILED_STATUSES and deleteContentResponse.get("errorCode") != "ResourceNotFoundException":
+        return deleteContentResponse
+    CONTENT_INDEX.delete(knowledgeBaseId, key)
+    return {"status": "SUCCESS", "action": "DELETE", "data": "Wisdom Content Successfully Deleted"}
+
+#####################################################
+# Reconciliation / Backfill: Diff the Amazon S3 Bucket with the Wisdom KnowledgeBase and apply creates, updates and deletes.
+# Invoke the function directly with {"action": "RECONCILE"} (optionally "bucket"). Each invocation processes pages, in slices
+# of RECONCILE_SLICE_SIZE items, until RECONCILE_TIME_RESERVE_MS remain, then returns its continuation state with "complete": false.
+# Invoke the function again with the returned state to resume; no work is repeated. A paused page is listed again
+# (same continuation token) and resumed at "pageOffset".
+# Phase 1 (WISDOM): Page through Wisdom ListContents of every routed KnowledgeBase, one after the other. Refresh the Content
+# Index and delete content whose S3 Object no longer exists (or is now routed to another KnowledgeBase).
+# Phase 2 (S3): Page through S3 ListObjectsV2. Create or update content whose ETag differs from the Content Index, in the
+# KnowledgeBase each object is routed to.
+#####################################################
+def reconcileKnowledgeBase(event, context):
+    state = {
+        "action": "RECONCILE",
+        "bucket": event.get("bucket") or S3_BUCKET_NAME,
+        "phase": event.get("phase", "WISDOM"),
+        "continuationToken": event.get("continuationToken"),
+        "wisdomPhaseComplete": event.get("wisdomPhaseComplete", False),
+        "knowledgeBaseIds": event.get("knowledgeBaseIds") or routedKnowledgeBaseIds(),
+        "knowledgeBaseIndex": event.get("knowledgeBaseIndex", 0),
+        "pageOffset": event.get("pageOffset", 0),
+        "counts": dict({"created": 0, "updated": 0, "deleted": 0, "unchanged": 0, "failed": 0}, **event.get("counts", {})),
+        "complete": False
+    }
+    startInvocationLogging(context)
+    log("INFO", "Reconciliation started", bucket=state["bucket"], phase=state["phase"], continuationToken=state["continuationToken"])
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENCY) as executor:
+        while context.get_remaining_time_in_millis() > RECONCILE_TIME_RESERVE_MS:
+            if state["phase"] == "WISDOM" and state["knowledgeBaseIndex"] < len(state["knowledgeBaseIds"]):
+                knowledgeBaseId = state["knowledgeBaseIds"][state["knowledgeBaseIndex"]]
+                page = wisdomListContents(knowledgeBaseId, state["continuationToken"])
+                if page["status"] in FAILED_STATUSES:
+                    log("ERROR", "Reconciliation failed - Wisdom ListContents", error=page["data"], state=state)
+                    METRICS.flush()
+                    return state
+                items = page["data"]
+                reconcileItem = lambda contentSummary: traceObjectSync(knowledgeBaseId, state["bucket"], contentSummary["name"], "Reconcile:Wisdom", reconcileWisdomContent, knowledgeBaseId, state["bucket"], contentSummary)
+                nextToken = page.get("nextToken")
+            elif state["phase"] == "WISDOM":
+                # Every KnowledgeBase has been listed
+                items, reconcileItem, nextToken = [], None, None
             else:
-                print("DELETE - Object: ", key, " does not exist in KnowledgeBase, nothing to delete")
-                return
-        # Case 3: Unsupported S3 Event Type
-        else:
-            print("Event not supported: ", eventName)
+                page = s3ListObjects(state["bucket"], state["continuationToken"])
+                if page["status"] in FAILED_STATUSES:
+                    log("ERROR", "Reconciliation failed - S3 ListObjectsV2", error=page["data"], state=state)
+                    METRICS.flush()
+                    return state
+                items = [(routeKnowledgeBase(state["bucket"], s3Object["Key"]), s3Object) for s3Object in page["data"]]
+                reconcileItem = lambda routedObject: traceObjectSync(routedObject[0], state["bucket"], routedObject[1]["Key"], "Reconcile:S3", reconcileS3Object, routedObject[0], state["bucket"], routedObject[1], state["wisdomPhaseComplete"])
+                nextToken = page.get("nextToken")
+
+            # A page can hold more work than fits in one invocation (Ex. 1000 new S3 Objects at 10 CreateContent/second):
+            # reconcile it in slices and pause within the page when the time reserve is reached.
+            while state["pageOffset"] < len(items) and context.get_remaining_time_in_millis() > RECONCILE_TIME_RESERVE_MS:
+                pageSlice = items[state["pageOffset"]:state["pageOffset"] + RECONCILE_SLICE_SIZE]
+                for result in executor.map(reconcileItem, pageSlice):
+                    reconcileCount = reconcileResultCount(result)
+                    if reconcileCount:
+                        state["counts"][reconcileCount] += 1
+                state["pageOffset"] += len(pageSlice)
+            if state["pageOffset"] < len(items):
+                break
+
+            # Advance to the next page, the next KnowledgeBase, the next phase, or finish.
+            state["pageOffset"] = 0
+            state["continuationToken"] = nextToken
+            if nextToken is None and state["phase"] == "WISDOM" and state["knowledgeBaseIndex"] + 1 < len(state["knowledgeBaseIds"]):
+                state["knowledgeBaseIndex"] += 1
+            elif nextToken is None and state["phase"] == "WISDOM":
+                state["phase"] = "S3"
+                state["wisdomPhaseComplete"] = True
+            elif nextToken is None:
+                state["complete"] = True
+                break
+
+    log("INFO", "Reconciliation complete" if state["complete"] else "Reconciliation paused", state=state)
+    METRICS.flush()
+    return state
+
+# Phase 1 (WISDOM): Refresh the Content Index from a Wisdom ContentSummary. Delete the content if its S3 Object no longer exists,
+# or if the object is now routed to another KnowledgeBase (it is created there in the S3 phase).
+# Content that was not synchronized from this bucket (no matching sourceS3Bucket metadata) is ignored. Existing objects are
+# counted in the S3 phase, so they return None here.
+def reconcileWisdomContent(knowledgeBaseId, bucket, contentSummary):
+    metadata = contentSummary.get("metadata", {})
+    if metadata.get("sourceS3Bucket") != bucket:
+        return None
+    key = metadata.get("sourceS3Key", contentSummary["name"])
+    indexEntry = contentIndexEntry(contentSummary, metadata)
+    if routeKnowledgeBase(bucket, key) != knowledgeBaseId:
+        return syncObjectRemoved(knowledgeBaseId, key, {"status": "SUCCESS", "data": indexEntry, "source": "LIST"})
+    # Chunks are indexed under their object Key on lookup (lookupWisdomChunks), not one by one
+    if "chunkIndex" not in metadata:
+        CONTENT_INDEX.put(knowledgeBaseId, key, indexEntry)
+
+    s3HeadObjectResponse = s3HeadObject(bucket, key)
+    if s3HeadObjectResponse.get("status") in FAILED_STATUSES:
+        return s3HeadObjectResponse
+    if len(s3HeadObjectResponse) == 0:
+        return syncObjectRemoved(knowledgeBaseId, key, {"status": "SUCCESS", "data": indexEntry, "source": "LIST"})
+    return None
+
+# Phase 2 (S3): Create or update Wisdom Content for an S3 Object (from ListObjectsV2) whose ETag differs from the Content Index.
+# Once the WISDOM phase has completed against a persistent Content Index, an index miss means the content does not exist in Wisdom.
+def reconcileS3Object(knowledgeBaseId, bucket, s3Object, wisdomPhaseComplete):
+    key = s3Object["Key"]
+    if not key.endswith(SYNC_KEY_SUFFIXES) or knowledgeBaseId is None:
+        return None
+
+    indexEntry = CONTENT_INDEX.get(knowledgeBaseId, key)
+    if indexEntry and indexEntry.get("etag") == s3Object["ETag"]:
+        return {"status": "SKIPPED", "data": "Object unchanged"}
+    if indexEntry or (wisdomPhaseComplete and CONTENT_INDEX.persistent):
+        existingContentResponse = {"status": "SUCCESS", "data": indexEntry, "source": "INDEX"}
+    else:
+        existingContentResponse = lookupWisdomContent(knowledgeBaseId, key)
+        if existingContentResponse["status"] in FAILED_STATUSES:
+            return existingContentResponse
+
+    # S3 Event Notifications use URL encoded keys (raw keys), which are used for the Wisdom LinkOutUri.
+    return syncObjectCreated(knowledgeBaseId, bucket, key, quote_plus(key, safe="/"), None, existingContentResponse)
+
+# Map a reconciliation result to its counter (created/updated/deleted/unchanged/failed). Returns None for ignored items.
+def reconcileResultCount(result):
+    if result is None:
+        return None
+    if result["status"] in FAILED_STATUSES:
+        return "failed"
+    return {"CREATE": "created", "UPDATE": "updated", "DELETE": "deleted"}.get(result.get("action"), "unchanged")
+
+#####################################################
+# Dead-Letter Queue Replay: SQS moves messages that failed maxReceiveCount times to the dead-letter queue (redrive policy).
+# Once the cause of the failures is resolved (Ex. a Wisdom outage), invoke the function directly with {"action": "REPLAY_DLQ"}
+# to synchronize them again through the same pipeline as SQS events.
+# - Each round receives up to REPLAY_BATCH_SIZE messages (parallel SQS ReceiveMessage calls), synchronizes them concurrently,
+#   and deletes the synchronized messages from the dead-letter queue. Messages that fail again stay in the queue.
+# - Messages are replayed at up to "rateLimit" (REPLAY_RATE_LIMIT) messages/second, Wisdom API calls are also paced by the
+#   Wisdom API rate limiters. "maxMessages" limits the number of messages received by the invocation.
+# - {"action": "REPLAY_DLQ", "dryRun": true} reports the messages (events, knowledge bases, keys) without synchronizing or
+#   deleting them.
+# Each invocation runs until the queue is empty or RECONCILE_TIME_RESERVE_MS remain. "complete": false means invoke it again.
+#####################################################
+def replayDeadLetterQueue(event, context):
+    queueUrl = event.get("queueUrl") or DLQ_QUEUE_URL
+    dryRun = bool(event.get("dryRun", False))
+    maxMessages = int(event.get("maxMessages") or 0)
+    rateLimiter = AdaptiveTokenBucket(float(event.get("rateLimit") or REPLAY_RATE_LIMIT))
+    report = {"action": "REPLAY_DLQ", "dryRun": dryRun, "received": 0, "replayed": 0, "failed": 0, "complete": False}
+    if dryRun:
+        report.update(objects=0, unparseable=0, events={}, knowledgeBases={}, keys=[])
+    startInvocationLogging(context)
+    log("INFO", "Dead-letter queue replay started", queueUrl=queueUrl, dryRun=dryRun, maxMessages=maxMessages)
+    if not queueUrl:
+        log("ERROR", "Dead-letter queue replay failed - no queue URL (DLQ_QUEUE_URL)")
+        return dict(report, error="No dead-letter queue URL")
+
+    dryRunReceiptHandles = []
+    while context.get_remaining_time_in_millis() > RECONCILE_TIME_RESERVE_MS:
+        count = REPLAY_BATCH_SIZE if not maxMessages else min(REPLAY_BATCH_SIZE, maxMessages - report["received"])
+        if count <= 0:
+            break
+        # Received messages stay invisible until the invocation ends, so no message is received twice by this invocation.
+        visibilityTimeout = int(context.get_remaining_time_in_millis() / 1000) + 1
+        page = sqsReceiveMessages(queueUrl, count, visibilityTimeout)
+        if page["status"] in FAILED_STATUSES:
+            log("ERROR", "Dead-letter queue replay failed - SQS ReceiveMessage", error=page["data"])
+            report["error"] = page["data"]
+            break
+        if not page["data"]:
+            report["complete"] = True
+            break
+        report["received"] += len(page["data"])
+        sqsRecords = [sqsMessageRecord(message) for message in page["data"]]
+
+        if dryRun:
+            addReplayReport(report, sqsRecords)
+            dryRunReceiptHandles.extend(sqsRecord["receiptHandle"] for sqsRecord in sqsRecords)
+            continue
+
+        for sqsRecord in sqsRecords:
+            rateLimiter.acquire()
+        failedMessageIds, objectCount = syncSQSMessages(sqsRecords, queueMetrics=False)
+        replayedRecords = [sqsRecord for sqsRecord in sqsRecords if sqsRecord["messageId"] not in failedMessageIds]
+        sqsDeleteMessages(queueUrl, [sqsRecord["receiptHandle"] for sqsRecord in replayedRecords])
+        report["replayed"] += len(replayedRecords)
+        report["failed"] += len(failedMessageIds)
+        log("INFO", "Dead-letter queue replay round complete", messages=len(sqsRecords), objects=objectCount, failedMessages=len(failedMessageIds))
+
+    # Dry run: return the messages to the dead-letter queue
+    sqsReleaseMessages(queueUrl, dryRunReceiptHandles)
+    report["complete"] = report["complete"] or (maxMessages > 0 and report["received"] >= maxMessages and "error" not in report)
+    METRICS.put("MessagesReplayed", report["replayed"], "Count")
+    METRICS.put("MessagesReplayFailed", report["failed"], "Count")
+    log("INFO", "Dead-letter queue replay complete" if report["complete"] else "Dead-letter queue replay paused", report=report)
+    METRICS.flush()
+    return report
+
+# SQS ReceiveMessage message -> SQS event record (the format of the Lambda SQS trigger)
+def sqsMessageRecord(message):
+    return {"messageId": message["MessageId"], "receiptHandle": message["ReceiptHandle"], "body": message["Body"], "attributes": message.get("Attributes", {})}
+
+# Dry run: count the S3 records of the messages by event name and KnowledgeBase, and list their keys (up to REPLAY_REPORT_MAX_KEYS).
+def addReplayReport(report, sqsRecords):
+    for sqsRecord in sqsRecords:
+        try:
+            s3EventBodies = parseSQSRecord(sqsRecord)
+        except Exception:
+            report["unparseable"] += 1
+            continue
+        for s3EventBody in s3EventBodies:
+            bucket = s3EventBody["s3"]["bucket"]["name"]
+            key = unquote_plus(s3EventBody["s3"]["object"]["key"])
+            knowledgeBaseId = routeKnowledgeBase(bucket, key) or "NONE"
+            report["objects"] += 1
+            report["events"][s3EventBody["eventName"]] = report["events"].get(s3EventBody["eventName"], 0) + 1
+            report["knowledgeBases"][knowledgeBaseId] = report["knowledgeBases"].get(knowledgeBaseId, 0) + 1
+            if len(report["keys"]) < REPLAY_REPORT_MAX_KEYS:
+                report["keys"].append(key)
+
+#####################################################
+# Content Index: S3 Object Key -> Wisdom Content (contentId, revisionId, ETag)
+# Avoids a Wisdom SearchContent call for every event. SearchContent is only used on an index miss or a stale revision.
+#####################################################
+
+# Look up the Wisdom Content for an S3 Object Key. Returns {"status", "data": contentIndexEntry or None, "source": "INDEX" | "SEARCH"}
+def lookupWisdomContent(knowledgeBaseId, key):
+    indexEntry = CONTENT_INDEX.get(knowledgeBaseId, key)
+    if indexEntry:
+        return {"status": "SUCCESS", "data": indexEntry, "source": "INDEX"}
+
+    # Index miss: Search for existing Wisdom Content with the same Key
+    searchWisdomContentResponse = wisdomSearchContent(knowledgeBaseId, key)
+    if searchWisdomContentResponse["status"] in FAILED_STATUSES:
+        return searchWisdomContentResponse
+    if not len(searchWisdomContentResponse["data"]):
+        return lookupWisdomChunks(knowledgeBaseId, key) if CHUNKING_MODE else {"status": "SUCCESS", "data": None, "source": "SEARCH"}
+
+    contentSummary = searchWisdomContentResponse["data"][0]
+    indexEntry = contentIndexEntry(contentSummary, contentSummary.get("metadata", {}))
+    CONTENT_INDEX.put(knowledgeBaseId, key, indexEntry)
+    return {"status": "SUCCESS", "data": indexEntry, "source": "SEARCH"}
+
+# Build a Content Index entry from a Wisdom Content (or ContentSummary) object and its source fingerprint. Empty attributes are not stored.
+def contentIndexEntry(content, sourceFingerprint):
+    indexEntry = {
+        "contentId": content["contentId"],
+        "revisionId": content["revisionId"],
+        "etag": sourceFingerprint.get("sourceS3ETag"),
+        "versionId": sourceFingerprint.get("sourceS3Version"),
+        "sequencer": sourceFingerprint.get("sourceS3Sequencer")
+    }
+    return {name: value for name, value in indexEntry.items() if value}
+
+# Look up the chunks of a chunked S3 Object: chunk names are searched in order (chunkContentName) until one does not exist.
+# The source fingerprint is read from the first chunk, which is written last.
+def lookupWisdomChunks(knowledgeBaseId, key):
+    chunkSummaries = []
+    while True:
+        searchWisdomContentResponse = wisdomSearchContent(knowledgeBaseId, chunkContentName(key, len(chunkSummaries)))
+        if searchWisdomContentResponse["status"] in FAILED_STATUSES:
+            return searchWisdomContentResponse
+        if not len(searchWisdomContentResponse["data"]):
+            break
+        chunkSummaries.append(searchWisdomContentResponse["data"][0])
+    if not chunkSummaries:
+        return {"status": "SUCCESS", "data": None, "source": "SEARCH"}
+
+    indexEntry = chunkedContentIndexEntry([chunkIndexEntry(chunkSummary) for chunkSummary in chunkSummaries], chunkSummaries[0].get("metadata", {}))
+    CONTENT_INDEX.put(knowledgeBaseId, key, indexEntry)
+    return {"status": "SUCCESS", "data": indexEntry, "source": "SEARCH"}
+
+# Content Index entry of a chunked S3 Object: the source fingerprint and the chunks (contentId, revisionId, chunkHash) in order.
+def chunkedContentIndexEntry(chunkEntries, sourceFingerprint):
+    indexEntry = {
+        "etag": sourceFingerprint.get("sourceS3ETag"),
+        "versionId": sourceFingerprint.get("sourceS3Version"),
+        "sequencer": sourceFingerprint.get("sourceS3Sequencer"),
+        "chunks": chunkEntries
+    }
+    return {name: value for name, value in indexEntry.items() if value}
+
+def chunkIndexEntry(content):
+    return {"contentId": content["contentId"], "revisionId": content["revisionId"], "chunkHash": content.get("metadata", {}).get("chunkHash")}
+
+# In-memory Content Index with LRU eviction. Lives for the life of a warm Lambda container.
+class InMemoryContentIndex:
+    persistent = False
+
+    def __init__(self, maxEntries):
+        self.maxEntries = maxEntries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, knowledgeBaseId, key):
+        with self.lock:
+            indexEntry = self.entries.get((knowledgeBaseId, key))
+            if indexEntry is not None:
+                self.entries.move_to_end((knowledgeBaseId, key))
+            return indexEntry
+
+    def put(self, knowledgeBaseId, key, indexEntry):
+        with self.lock:
+            self.entries[(knowledgeBaseId, key)] = indexEntry
+            self.entries.move_to_end((knowledgeBaseId, key))
+            while len(self.entries) > self.maxEntries:
+                self.entries.popitem(last=False)
+
+    def delete(self, knowledgeBaseId, key):
+        with self.lock:
+            self.entries.pop((knowledgeBaseId, key), None)
+
+# Persistent Content Index backed by a DynamoDB-style table (get_item/put_item/delete_item), fronted by an in-memory LRU cache.
+# Table Key Schema: knowledgeBaseId (Partition Key), objectKey (Sort Key)
+# Reference: https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/dynamodb/table/index.html
+class TableContentIndex:
+    persistent = True
+
+    def __init__(self, tableName, cache, table=None):
+        self.tableName = tableName
+        self.cache = cache
+        self._table = table
+
+    # DynamoDB Table resource, created on first use
+    @property
+    def table(self):
+        if self._table is None:
+            self._table = getAwsClient("resource:dynamodb").Table(self.tableName)
+        return self._table
+
+    def get(self, knowledgeBaseId, key):
+        indexEntry = self.cache.get(knowledgeBaseId, key)
+        if indexEntry is None:
+            item = self.table.get_item(Key={"knowledgeBaseId": knowledgeBaseId, "objectKey": key}).get("Item")
+            if item:
+                indexEntry = {name: value for name, value in item.items() if name not in ("knowledgeBaseId", "objectKey")}
+                self.cache.put(knowledgeBaseId, key, indexEntry)
+        return indexEntry
+
+    def put(self, knowledgeBaseId, key, indexEntry):
+        self.table.put_item(Item=dict(indexEntry, knowledgeBaseId=knowledgeBaseId, objectKey=key))
+        self.cache.put(knowledgeBaseId, key, indexEntry)
+
+    def delete(self, knowledgeBaseId, key):
+        self.table.delete_item(Key={"knowledgeBaseId": knowledgeBaseId, "objectKey": key})
+        self.cache.delete(knowledgeBaseId, key)
+
+# Create the Content Index: DynamoDB backed if CONTENT_INDEX_TABLE is set, otherwise in-memory only.
+def createContentIndex():
+    cache = InMemoryContentIndex(CONTENT_INDEX_CACHE_SIZE)
+    if CONTENT_INDEX_TABLE:
+        return TableContentIndex(CONTENT_INDEX_TABLE, cache)
+    return cache
+
+CONTENT_INDEX = createContentIndex()
+
+#####################################################
+# Content Transforms: applied between Amazon S3 GetObject and the Wisdom upload, in CONTENT_TRANSFORMS order.
+# - The content type is normalized first (parameters removed, derived from the key extension when missing or generic).
+# - "markdown" converts Markdown to HTML. "html" minifies HTML and strips scripts, inline event handlers and embedded
+#   (data: URI) images. Additional transforms can be registered with registerContentTransform().
+# Transformed content is cached by source ETag, so re-synchronizing unchanged content (Ex. retries, reconciliation,
+# updates after a stale revision) neither downloads the S3 Object nor repeats the conversion.
+#####################################################
+CONTENT_TRANSFORMERS = {}
+
+# Register a transform applied to the given content types: transformFunction(contentType, body) -> (contentType, body).
+# contentType is the full Content-Type (with charset) and body is bytes. outputContentType is the resulting media type.
+def registerContentTransform(name, contentTypes, outputContentType, transformFunction):
+    CONTENT_TRANSFORMERS[name] = (contentTypes, outputContentType, transformFunction)
+
+# Content types by key extension, used when an S3 Object has no (or a generic) Content-Type.
+EXTENSION_CONTENT_TYPES = {
+    ".html": "text/html",
+    ".htm": "text/html",
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".doc": "application/msword",
+    ".txt": "text/plain",
+    ".md": "text/markdown",
+    ".markdown": "text/markdown"
+}
+GENERIC_CONTENT_TYPES = ("", "binary/octet-stream", "application/octet-stream")
+
+def normalizeContentType(key, contentType):
+    contentType = (contentType or "").split(";")[0].strip().lower()
+    extensionContentType = EXTENSION_CONTENT_TYPES.get(os.path.splitext(key)[1].lower())
+    # Markdown is commonly stored as text/plain or binary/octet-stream
+    if extensionContentType and (contentType in GENERIC_CONTENT_TYPES or extensionContentType == "text/markdown"):
+        return extensionContentType
+    return contentType
+
+# Charset of a Content-Type header (Ex. "text/html; charset=ISO-8859-1"), UTF-8 by default.
+def contentTypeCharset(contentType):
+    for parameter in (contentType or "").split(";")[1:]:
+        name, _, value = parameter.partition("=")
+        if name.strip().lower() == "charset" and value.strip():
+            return value.strip().strip('"')
+    return "utf-8"
+
+# Names of the transforms applied to a content type, following the output of each transform (Ex. Markdown -> HTML -> minified HTML).
+def contentTransformChain(contentType):
+    chain = []
+    for name in CONTENT_TRANSFORMS:
+        contentTypes, outputContentType, transformFunction = CONTENT_TRANSFORMERS.get(name, ((), None, None))
+        if contentType in contentTypes:
+            chain.append(name)
+            contentType = outputContentType
+    return chain
+
+# In-memory cache of transformed content by (source ETag, transforms), LRU evicted above maxBytes.
+class TransformCache:
+    def __init__(self, maxBytes):
+        self.maxBytes = maxBytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, cacheKey):
+        with self.lock:
+            entry = self.entries.get(cacheKey)
+            if entry is not None:
+                self.entries.move_to_end(cacheKey)
+            return entry
+
+    def put(self, cacheKey, contentType, body):
+        if len(body) > self.maxBytes:
+            return
+        with self.lock:
+            if cacheKey in self.entries:
+                self.size -= len(self.entries.pop(cacheKey)[1])
+            self.entries[cacheKey] = (contentType, body)
+            self.size += len(body)
+            while self.size > self.maxBytes:
+                self.size -= len(self.entries.popitem(last=False)[1][1])
+
+TRANSFORM_CACHE = TransformCache(TRANSFORM_CACHE_MAX_BYTES)
+
+# Transformed content held in memory, with the StreamingBody methods used by the upload (read, iter_chunks, close).
+class TransformedBody(io.BytesIO):
+    def iter_chunks(self, chunk_size=1024):
+        while True:
+            chunk = self.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+def transformedS3Object(s3Object, contentType, body):
+    return dict(s3Object, Body=TransformedBody(body), ContentType=contentType, ContentLength=len(body))
+
+# Transformed S3 Object from the Transform Cache, using the S3 HeadObject response (ETag, VersionId). None on a cache miss.
+def cachedTransformedS3Object(key, s3HeadObjectResponse):
+    contentType = normalizeContentType(key, s3HeadObjectResponse.get("ContentType"))
+    chain = contentTransformChain(contentType)
+    if not chain or not s3HeadObjectResponse.get("ETag"):
+        return None
+    cachedContent = TRANSFORM_CACHE.get((s3HeadObjectResponse["ETag"], contentType, tuple(chain)))
+    if cachedContent is None:
+        return None
+    return transformedS3Object(s3HeadObjectResponse, *cachedContent)
+
+# Apply the content transforms to an S3 GetObject response. Objects without transforms (Ex. PDF, Word) or larger than
+# TRANSFORM_MAX_BYTES keep their streaming Body, only the content type is normalized.
+def transformS3Object(key, s3Object):
+    contentType = normalizeContentType(key, s3Object.get("ContentType"))
+    chain = contentTransformChain(contentType)
+    if not chain or (s3Object.get("ContentLength") or 0) > TRANSFORM_MAX_BYTES:
+        return dict(s3Object, ContentType=fallbackContentType(contentType))
+
+    sourceBody = s3Object["Body"].read()
+    s3Object["Body"].close()
+    # Transforms receive the full Content-Type, which carries the charset of the source
+    transformedContentType = contentType + "".join(";" + parameter for parameter in (s3Object.get("ContentType") or "").split(";")[1:])
+    body = sourceBody
+    try:
+        with traceStage("transform_content"):
+            for name in chain:
+                transformedContentType, body = CONTENT_TRANSFORMERS[name][2](transformedContentType, body)
+    except Exception as ex:
+        log("WARNING", "Content transform failed, uploading the original content", key=key, transforms=chain, error=str(ex))
+        return transformedS3Object(s3Object, fallbackContentType(contentType), sourceBody)
+
+    # Wisdom StartContentUpload accepts media types without parameters
+    transformedContentType = fallbackContentType(transformedContentType.split(";")[0].strip())
+    if s3Object.get("ETag"):
+        TRANSFORM_CACHE.put((s3Object["ETag"], contentType, tuple(chain)), transformedContentType, body)
+    METRICS.put("BytesSavedByTransforms", len(sourceBody) - len(body), "Bytes")
+    log("DEBUG", "Content transformed", key=key, transforms=chain, sourceBytes=len(sourceBody), transformedBytes=len(body))
+    return transformedS3Object(s3Object, transformedContentType, body)
+
+# Markdown that was not converted is uploaded as plain text.
+def fallbackContentType(contentType):
+    return "text/plain" if contentType == "text/markdown" else contentType
+
+# HTML minifier: collapses whitespace (except in <pre> and <textarea>), removes comments, scripts, inline event handlers,
+# javascript: URLs and embedded (data: URI) images. Tags that are not modified are kept as written.
+# Reference: https://docs.python.org/3/library/html.parser.html
+class HtmlMinifier(HTMLParser):
+    PRESERVE_WHITESPACE_TAGS = ("pre", "textarea")
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.output = []
+        self.inScript = False
+        self.preserveWhitespace = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "script":
+            self.inScript = True
+            return
+        if tag in self.PRESERVE_WHITESPACE_TAGS:
+            self.preserveWhitespace += 1
+        self.appendTag(self.filterTag(tag, attrs, ">"))
+
+    def handle_startendtag(self, tag, attrs):
+        if tag != "script":
+            self.appendTag(self.filterTag(tag, attrs, " />"))
+
+    def handle_endtag(self, tag):
+        if tag == "script":
+            self.inScript = False
             return
+        if tag in self.PRESERVE_WHITESPACE_TAGS:
+            self.preserveWhitespace = max(0, self.preserveWhitespace - 1)
+        self.output.append("</%s>" % tag)
+
+    def handle_data(self, data):
+        if self.inScript:
+            return
+        if not self.preserveWhitespace:
+            data = re.sub(r"\s+", " ", data)
+            # Whitespace around removed elements collapses to a single space
+            if data.startswith(" ") and self.output and self.output[-1].endswith(" "):
+                data = data[1:]
+        if data:
+            self.output.append(data)
+
+    def handle_entityref(self, name):
+        self.output.append("&%s;" % name)
+
+    def handle_charref(self, name):
+        self.output.append("&#%s;" % name)
+
+    def handle_decl(self, decl):
+        self.output.append("<!%s>" % decl)
+
+    def handle_pi(self, data):
+        self.output.append("<?%s>" % data)
+
+    def unknown_decl(self, data):
+        self.output.append("<![%s]>" % data)
+
+    def appendTag(self, tagText):
+        if tagText:
+            self.output.append(tagText)
+
+    # Original tag text, or the tag rebuilt without unsafe attributes. Elements with embedded (data:) images are dropped.
+    def filterTag(self, tag, attrs, tagEnd):
+        unsafe = [name for name, value in attrs if name.startswith("on") or (name in ("href", "src") and (value or "").strip().lower().startswith("javascript:"))]
+        if any(name in ("src", "srcset") and (value or "").strip().lower().startswith("data:image/") for name, value in attrs):
+            return ""
+        if not unsafe:
+            return self.get_starttag_text()
+        safeAttrs = "".join(" %s" % name if value is None else ' %s="%s"' % (name, html.escape(value)) for name, value in attrs if name not in unsafe)
+        return "<%s%s%s" % (tag, safeAttrs, tagEnd)
+
+def minifyHtml(contentType, body):
+    charset = contentTypeCharset(contentType)
+    minifier = HtmlMinifier()
+    minifier.feed(body.decode(charset, errors="surrogateescape"))
+    minifier.close()
+    return contentType, "".join(minifier.output).strip().encode(charset, errors="surrogateescape")
+
+# Markdown to HTML: headings, paragraphs, emphasis, inline and fenced code, links, images, lists, block quotes and rules.
+# Raw HTML in the Markdown source is escaped.
+def markdownToHtml(contentType, body):
+    lines = body.decode(contentTypeCharset(contentType), errors="replace").splitlines()
+    output, paragraph, listTag, index = [], [], None, 0
+
+    def closeBlocks(closeList=True):
+        nonlocal listTag
+        if paragraph:
+            output.append("<p>%s</p>" % markdownInline(" ".join(paragraph)))
+            paragraph.clear()
+        if closeList and listTag:
+            output.append("</%s>" % listTag)
+            listTag = None
+
+    while index < len(lines):
+        line = lines[index]
+        stripped = line.strip()
+        heading = re.match(r"^(#{1,6})\s+(.*?)\s*#*$", stripped)
+        listItem = re.match(r"^([-*+]|\d+[.)])\s+(.*)$", stripped)
+        if stripped.startswith("```"):
+            closeBlocks()
+            codeLines = []
+            index += 1
+            while index < len(lines) and not lines[index].strip().startswith("```"):
+                codeLines.append(lines[index])
+                index += 1
+            output.append("<pre><code>%s</code></pre>" % html.escape("\n".join(codeLines)))
+        elif not stripped:
+            closeBlocks()
+        elif heading:
+            closeBlocks()
+            output.append("<h%d>%s</h%d>" % (len(heading.group(1)), markdownInline(heading.group(2)), len(heading.group(1))))
+        elif re.match(r"^([-*_])(\s*\1){2,}$", stripped):
+            closeBlocks()
+            output.append("<hr>")
+        elif listItem:
+            closeBlocks(closeList=False)
+            tag = "ul" if listItem.group(1) in "-*+" else "ol"
+            if listTag != tag:
+                closeBlocks()
+                output.append("<%s>" % tag)
+                listTag = tag
+            output.append("<li>%s</li>" % markdownInline(listItem.group(2)))
+        elif stripped.startswith(">"):
+            closeBlocks()
+            output.append("<blockquote><p>%s</p></blockquote>" % markdownInline(stripped.lstrip("> ")))
+        else:
+            if listTag and not paragraph:
+                closeBlocks()
+            paragraph.append(stripped)
+        index += 1
+    closeBlocks()
+    return "text/html; charset=utf-8", ('<!DOCTYPE html><html><head><meta charset="utf-8"></head><body>%s</body></html>' % "".join(output)).encode("utf-8")
+
+# Inline Markdown (code spans are not formatted).
+def markdownInline(text):
+    parts = re.split(r"(`[^`]+`)", text)
+    for index, part in enumerate(parts):
+        if index % 2:
+            parts[index] = "<code>%s</code>" % html.escape(part[1:-1])
+            continue
+        part = html.escape(part, quote=False)
+        # The text is already escaped (without quotes): attribute values are unescaped first, so they are escaped exactly once
+        part = re.sub(r"!\[([^\]]*)\]\(([^)\s]+)\)", lambda match: '<img alt="%s" src="%s">' % (markdownAttribute(match.group(1)), markdownAttribute(match.group(2))), part)
+        part = re.sub(r"\[([^\]]+)\]\(([^)\s]+)\)", lambda match: '<a href="%s">%s</a>' % (markdownAttribute(match.group(2)), match.group(1)), part)
+        part = re.sub(r"(\*\*|__)(.+?)\1", r"<strong>\2</strong>", part)
+        part = re.sub(r"(?<![\w*])([*_])(?!\s)(.+?)(?<!\s)\1(?![\w*])", r"<em>\2</em>", part)
+        parts[index] = part
+    return "".join(parts)
+
+def markdownAttribute(escapedText):
+    return html.escape(html.unescape(escapedText))
+
+registerContentTransform("markdown", ("text/markdown",), "text/html", markdownToHtml)
+registerContentTransform("html", ("text/html",), "text/html", minifyHtml)
+
+#####################################################
+# Content Chunking (CHUNKING_MODE): HTML and plain text objects larger than CHUNKING_THRESHOLD_BYTES are split into
+# chunks, each synchronized as its own Wisdom Content named "<key>#chunk-<index>" (chunkContentName).
+# - "heading": HTML is split before every heading up to CHUNK_HEADING_LEVEL (Ex. <h1>, <h2>). Sections larger than
+#   CHUNK_MAX_BYTES are split further by size.
+# - "size": content is packed into chunks of up to CHUNK_MAX_BYTES, split at block element (or line) boundaries.
+# Every chunk carries its chunkIndex and chunkHash in Wisdom metadata. On update, chunks whose hash is unchanged are not
+# uploaded again. Deleting the S3 Object deletes every chunk.
+#####################################################
+CHUNKABLE_CONTENT_TYPES = ("text/html", "text/plain")
+CHUNKING_SEMAPHORE = threading.BoundedSemaphore(CHUNKING_CONCURRENCY)
+HTML_BLOCK_END = re.compile(r"</(?:p|div|li|ul|ol|table|pre|blockquote|section|article|h[1-6])\s*>|\n", re.IGNORECASE)
+
+# Deterministic Wisdom Content name of a chunk
+def chunkContentName(key, index):
+    return "%s#chunk-%04d" % (key, index)
+
+# An S3 Object is chunked if chunking is enabled, its content type can be split, and it is larger than CHUNKING_THRESHOLD_BYTES
+# but not larger than CHUNKING_MAX_SOURCE_BYTES.
+def isChunkable(key, s3Object):
+    if CHUNKING_MODE not in ("heading", "size") or s3Object["ContentType"] not in CHUNKABLE_CONTENT_TYPES:
+        return False
+    contentLength = s3Object.get("ContentLength") or 0
+    if contentLength <= CHUNKING_THRESHOLD_BYTES:
+        return False
+    if contentLength > CHUNKING_MAX_SOURCE_BYTES:
+        log("INFO", "Object too large to chunk, uploading it as a single Wisdom Content", key=key, contentLength=contentLength, maxBytes=CHUNKING_MAX_SOURCE_BYTES)
+        return False
+    return True
+
+# Split a chunkable (isChunkable), transformed S3 Object into chunks: [{"index", "name", "title", "body", "chunkHash"}].
+def chunkS3Object(key, s3Object):
+
+    # surrogateescape keeps the original bytes of any ASCII compatible charset
+    with traceStage("chunk_content"):
+        text = s3Object["Body"].read().decode("utf-8", errors="surrogateescape")
+        s3Object["Body"].close()
+        if s3Object["ContentType"] == "text/html":
+            sections = splitHtmlDocument(text)
+        else:
+            sections = [(None, section, section) for section in packChunkBlocks(text.splitlines(keepends=True))]
+
+    chunks = []
+    for heading, content, document in sections:
+        index = len(chunks)
+        title = "%s - %s" % (key, heading) if heading else "%s (%d)" % (key, index + 1)
+        body = document.encode("utf-8", errors="surrogateescape")
+        chunks.append({
+            "index": index,
+            "name": chunkContentName(key, index),
+            "title": title,
+            "body": body,
+            "chunkHash": hashlib.sha256(title.encode("utf-8", errors="surrogateescape") + b"\0" + body).hexdigest()
+        })
+    return chunks
+
+# Split an HTML document into sections: [(heading text, section HTML, section as a complete HTML document)]. Every section
+# keeps the <head> of the source document (charset, styles).
+def splitHtmlDocument(text):
+    headMatch = re.search(r"<head\b.*?</head\s*>", text, re.IGNORECASE | re.DOTALL)
+    bodyMatch = re.search(r"<body\b[^>]*>(.*?)(?:</body\s*>|$)", text, re.IGNORECASE | re.DOTALL)
+    head = headMatch.group(0) if headMatch else ""
+    body = bodyMatch.group(1) if bodyMatch else text
+
+    if CHUNKING_MODE == "heading":
+        headingStarts = [match.start() for match in re.finditer(r"<h[1-%d][\s>]" % CHUNK_HEADING_LEVEL, body, re.IGNORECASE)]
+        boundaries = [0] + [start for start in headingStarts if start > 0] + [len(body)]
+        sections = [body[start:end] for start, end in zip(boundaries, boundaries[1:])]
+    else:
+        sections = [body]
+
+    # Sections larger than CHUNK_MAX_BYTES are split at block element boundaries
+    chunks = []
+    for section in sections:
+        blocks, start = [], 0
+        for match in HTML_BLOCK_END.finditer(section):
+            blocks.append(section[start:match.end()])
+            start = match.end()
+        blocks.append(section[start:])
+        headingMatch = re.search(r"<h[1-6][^>]*>(.*?)</h[1-6]\s*>", section, re.IGNORECASE | re.DOTALL)
+        heading = html.unescape(re.sub(r"<[^>]+>|\s+", " ", headingMatch.group(1))).strip() if headingMatch else None
+        for index, content in enumerate(packChunkBlocks(blocks)):
+            # Continued sections are numbered (Ex. "Installation (2)")
+            chunkHeading = "%s (%d)" % (heading, index + 1) if heading and index else heading
+            chunks.append((chunkHeading, content, "<!DOCTYPE html><html>%s<body>%s</body></html>" % (head, content)))
+    return chunks
+
+# Pack consecutive blocks into chunks of up to CHUNK_MAX_BYTES. A single block larger than CHUNK_MAX_BYTES is kept whole,
+# so markup is never cut. Whitespace-only chunks are dropped.
+def packChunkBlocks(blocks):
+    chunks, current, currentBytes = [], [], 0
+    for block in blocks:
+        blockBytes = len(block.encode("utf-8", errors="surrogateescape"))
+        if current and currentBytes + blockBytes > CHUNK_MAX_BYTES:
+            chunks.append("".join(current))
+            current, currentBytes = [], 0
+        current.append(block)
+        currentBytes += blockBytes
+    chunks.append("".join(current))
+    return [chunk for chunk in chunks if chunk.strip()]
+
+# Synchronize a chunked S3 Object. Chunks are created or updated in parallel (up to CHUNK_UPLOAD_CONCURRENCY). The first
+# chunk is written last, with the source fingerprint of the object, so the fingerprint is only recorded once every chunk is
+# current. Chunks left over from a longer previous version, or the previous (unchunked) Wisdom Content, are deleted.
+def syncObjectChunks(knowledgeBaseId, bucket, key, raw_key, sequencer, existingContent, s3Object, chunks):
+    sourceFingerprint = s3ObjectFingerprint(s3Object, sequencer)
+    existingChunks = (existingContent or {}).get("chunks", [])
+    syncChunkFunction = lambda chunk: syncChunk(knowledgeBaseId, bucket, key, raw_key, s3Object, chunk, existingChunks[chunk["index"]] if chunk["index"] < len(existingChunks) else None, sourceFingerprint)
+
+    chunkResults = []
+    if len(chunks) > 1:
+        with ThreadPoolExecutor(max_workers=min(CHUNK_UPLOAD_CONCURRENCY, len(chunks) - 1)) as executor:
+            chunkResults = list(executor.map(syncChunkFunction, chunks[1:]))
+    failedResults = [result for result in chunkResults if result["status"] in FAILED_STATUSES]
+    if not failedResults:
+        chunkResults.insert(0, syncChunkFunction(chunks[0]))
+        failedResults = [result for result in chunkResults[:1] if result["status"] in FAILED_STATUSES]
+    if failedResults:
+        # Chunks written by this attempt are found by Wisdom SearchContent when the event is retried
+        CONTENT_INDEX.delete(knowledgeBaseId, key)
+        return failedResults[0]
+
+    # Previous content that is not part of the new chunk set
+    staleContents = existingChunks[len(chunks):] + ([existingContent] if existingContent and existingContent.get("contentId") else [])
+    deleteResponse = deleteWisdomContents(knowledgeBaseId, staleContents)
+    if deleteResponse:
+        log("WARNING", "Previous Wisdom Content of a chunked object was not deleted", key=key, error=deleteResponse["data"])
+
+    uploadedChunks = sum(1 for result in chunkResults if result["status"] == "SUCCESS" and result["uploaded"])
+    METRICS.put("ChunksUploaded", uploadedChunks, "Count")
+    METRICS.put("ChunksUnchanged", len(chunks) - uploadedChunks, "Count")
+    CONTENT_INDEX.put(knowledgeBaseId, key, chunkedContentIndexEntry([result["data"] for result in chunkResults], sourceFingerprint))
+    return {
+        "status": "SUCCESS",
+        "action": "UPDATE" if existingContent else "CREATE",
+        "data": {"chunks": len(chunks), "uploadedChunks": uploadedChunks, "deletedContents": len(staleContents)}
+    }
+
+# Create or update the Wisdom Content of a single chunk. Unchanged chunks (same chunkHash) are skipped, except for the first
+# chunk, whose metadata is updated with the new source fingerprint without uploading its content again.
+# The chunk is looked up again with Wisdom SearchContent if its revision is stale or it already exists (Ex. written by a failed attempt).
+def syncChunk(knowledgeBaseId, bucket, key, raw_key, s3Object, chunk, existingChunk, sourceFingerprint):
+    chunkFingerprint = dict(sourceFingerprint, chunkIndex=str(chunk["index"]), chunkHash=chunk["chunkHash"])
+    if existingChunk and existingChunk.get("chunkHash") == chunk["chunkHash"] and chunk["index"] > 0:
+        return {"status": "SKIPPED", "data": existingChunk, "uploaded": False}
+
+    uploadId = None
+    for attempt in range(2):
+        if uploadId is None and not (existingChunk and existingChunk.get("chunkHash") == chunk["chunkHash"]):
+            uploadResponse = wisdomStartContentUpload(knowledgeBaseId, transformedS3Object(s3Object, s3Object["ContentType"], chunk["body"]))
+            if uploadResponse["status"] in FAILED_STATUSES:
+                return uploadResponse
+            uploadId = uploadResponse["data"]
+        upsertContentResponse = upsertWisdomContent(knowledgeBaseId, uploadId, bucket, key, raw_key, existingChunk, chunkFingerprint, contentName=chunk["name"], title=chunk["title"])
+        if attempt or upsertContentResponse.get("errorCode") not in STALE_CONTENT_ERRORS + ("ConflictException",):
+            break
+        searchResponse = wisdomSearchContent(knowledgeBaseId, chunk["name"])
+        if searchResponse["status"] in FAILED_STATUSES:
+            return searchResponse
+        existingChunk = chunkIndexEntry(searchResponse["data"][0]) if searchResponse["data"] else None
+
+    if upsertContentResponse["status"] in FAILED_STATUSES:
+        return upsertContentResponse
+    return {"status": "SUCCESS", "data": chunkIndexEntry(upsertContentResponse["data"]), "uploaded": uploadId is not None}
+
+# Delete Wisdom Contents (Ex. the chunks of an object) in parallel. Content that no longer exists is ignored.
+# Returns the first failed response, or None when every content was deleted.
+def deleteWisdomContents(knowledgeBaseId, contents):
+    if not contents:
+        return None
+    with ThreadPoolExecutor(max_workers=min(CHUNK_UPLOAD_CONCURRENCY, len(contents))) as executor:
+        responses = list(executor.map(lambda content: wisdomDeleteContent(knowledgeBaseId, content), contents))
+    failedResponses = [response for response in responses if response["status"] in FAILED_STATUSES and response.get("errorCode") != "ResourceNotFoundException"]
+    return failedResponses[0] if failedResponses else None
+
+#####################################################
+# Wisdom API Rate Limiting: A shared token bucket per KnowledgeBase and Wisdom operation, with adaptive backoff on throttling and jittered retries.
+#####################################################
+
+# Token bucket with adaptive rate: the rate is halved on every throttling response, and recovers gradually on success.
+class AdaptiveTokenBucket:
+    def __init__(self, maxRate):
+        self.maxRate = maxRate
+        self.minRate = min(maxRate, 0.5)
+        self.rate = maxRate
+        self.capacity = max(1.0, maxRate)
+        self.tokens = self.capacity
+        self.updatedAt = time.monotonic()
+        self.throttleCount = 0
+        self.lock = threading.Lock()
+
+    # Block until a token is available
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updatedAt) * self.rate)
+                self.updatedAt = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def onThrottle(self):
+        with self.lock:
+            self.throttleCount += 1
+            self.rate = max(self.minRate, self.rate / 2)
+
+    def onSuccess(self):
+        with self.lock:
+            self.rate = min(self.maxRate, self.rate + self.maxRate / 20)
+
+WISDOM_RATE_LIMITERS = {}
+WISDOM_RATE_LIMITERS_LOCK = threading.Lock()
+
+# Shared rate limiter of a Wisdom operation (Ex. "search_content" -> "SearchContent" limit) for a KnowledgeBase.
+# Rate: the KnowledgeBase route ("rateLimits" for the operation, then "rateLimit"), then WISDOM_API_RATE_LIMITS, then WISDOM_API_RATE_LIMIT.
+def getWisdomRateLimiter(operationName, knowledgeBaseId=None):
+    with WISDOM_RATE_LIMITERS_LOCK:
+        if (knowledgeBaseId, operationName) not in WISDOM_RATE_LIMITERS:
+            apiName = "".join(part.title() for part in operationName.split("_"))
+            route = knowledgeBaseRoute(knowledgeBaseId) or {"rateLimits": {}, "rateLimit": None}
+            rate = route["rateLimits"].get(apiName, route["rateLimit"] or WISDOM_API_RATE_LIMITS.get(apiName, WISDOM_API_RATE_LIMIT))
+            WISDOM_RATE_LIMITERS[(knowledgeBaseId, operationName)] = AdaptiveTokenBucket(float(rate))
+        return WISDOM_RATE_LIMITERS[(knowledgeBaseId, operationName)]
+
+# ThrottlingException / HTTP 429 responses from Wisdom
+def isThrottlingError(e):
+    return e.response.get("Error", {}).get("Code") in ("ThrottlingException", "TooManyRequestsException", "Throttling") or e.response.get("ResponseMetadata", {}).get("HTTPStatusCode") == 429
+
+# HTTP 5xx responses from Wisdom (Ex. InternalServerException), retried like throttles but without slowing the rate limiter
+def isTransientError(e):
+    return e.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0) >= 500
+
+# Call a Wisdom API operation (Ex. "search_content") through its rate limiter. Throttled requests, 5xx responses and
+# connection errors are retried with full jitter backoff (the Wisdom client makes a single attempt, WISDOM_BOTO_CONFIG).
+# Reference: https://aws.amazon.com/blogs/architecture/exponential-backoff-and-jitter/
+# The stage duration of the operation includes rate limiter waits and retries.
+def callWisdomApi(operationName, **request):
+    knowledgeBaseId = request.get("knowledgeBaseId")
+    rateLimiter = getWisdomRateLimiter(operationName, knowledgeBaseId)
+    with traceStage(operationName, knowledgeBaseId):
+        for attempt in range(WISDOM_API_MAX_RETRIES + 1):
+            rateLimiter.acquire()
+            try:
+                response = getattr(getAwsClient("wisdom"), operationName)(**request)
+                rateLimiter.onSuccess()
+                return response
+            except ClientError as e:
+                throttled = isThrottlingError(e)
+                if not throttled and not isTransientError(e):
+                    raise
+                if throttled:
+                    METRICS.put("Throttles", 1, "Count", operation=operationName, knowledgeBaseId=knowledgeBaseId)
+                if attempt == WISDOM_API_MAX_RETRIES:
+                    raise
+                if throttled:
+                    rateLimiter.onThrottle()
+                error = e.response.get("Error", {}).get("Code")
+            except (BotoConnectionError, HTTPClientError) as ex:
+                if attempt == WISDOM_API_MAX_RETRIES:
+                    raise
+                error = str(ex)
+            backoff = random.uniform(0, min(20.0, 0.2 * (2 ** attempt)))
+            log("DEBUG", "Wisdom API request failed, retrying", operation=operationName, attempt=attempt + 1, error=error, backoffMs=round(backoff * 1000))
+            time.sleep(backoff)
 
 # Search Amazon Connect Wisdom Knowledge Base for Content (Accepts either Instance ID or ARN)
 # Reference: https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/wisdom/client/search_content.html#
 # CLI Example: aws wisdom search-content --knowledge-base-id arn:aws:wisdom:REGION:ACCOUNTID:knowledge-base/KNOWLEDGEBASEID --search-expression "{"filters": [{"field": "NAME", "operator": "EQUALS","value": "sample/password-reset.html"}]}
 def wisdomSearchContent(knowledgeBaseId, key):
     try:
-        search = WISDOM_CLIENT.search_content(
+        search = callWisdomApi("search_content",
             knowledgeBaseId = knowledgeBaseId,
             maxResults = 100,
             searchExpression={
@@ -149,136 +1627,251 @@ def wisdomSearchContent(knowledgeBaseId, key):
                 }]
             }
         )
-        print("SUCCESS - Wisdom SearchContent - Key: ", key, " Results: ", search)
+        log("DEBUG", "Wisdom SearchContent", key=key, response=search)
         return {"status": "SUCCESS", "data": search["contentSummaries"]}
     except ClientError as e:
-        print("Client Error - Wisdom SearchContent: ", str(e))
+        log("WARNING", "Client Error - Wisdom SearchContent", key=key, error=str(e))
+        return {"status": "CLIENT_ERROR", "data": str(e)}
+    except Exception as ex:
+        log("WARNING", "Exception - Wisdom SearchContent", key=key, error=str(ex))
+        return {"status": "EXCEPTION", "data": str(ex)}
+
+# List Amazon Connect Wisdom Knowledge Base Content: Returns a page of ContentSummaries and the token of the next page.
+# Reference: https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/wisdom/client/list_contents.html
+def wisdomListContents(knowledgeBaseId, nextToken=None):
+    try:
+        request = {"knowledgeBaseId": knowledgeBaseId, "maxResults": 100}
+        if nextToken:
+            request["nextToken"] = nextToken
+        response = callWisdomApi("list_contents", **request)
+        return {"status": "SUCCESS", "data": response["contentSummaries"], "nextToken": response.get("nextToken")}
+    except ClientError as e:
+        log("WARNING", "Client Error - Wisdom ListContents", error=str(e))
+        return {"status": "CLIENT_ERROR", "data": str(e)}
+    except Exception as ex:
+        log("WARNING", "Exception - Wisdom ListContents", error=str(ex))
+        return {"status": "EXCEPTION", "data": str(ex)}
+
+# Amazon S3 List Objects (V2): Returns a page of S3 Objects (Key, ETag, Size) and the continuation token of the next page.
+# Reference: https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3/client/list_objects_v2.html
+def s3ListObjects(bucketName, continuationToken=None):
+    try:
+        request = {"Bucket": bucketName, "MaxKeys": 1000}
+        if continuationToken:
+            request["ContinuationToken"] = continuationToken
+        response = getAwsClient("s3").list_objects_v2(**request)
+        return {"status": "SUCCESS", "data": response.get("Contents", []), "nextToken": response.get("NextContinuationToken")}
+    except ClientError as e:
+        log("WARNING", "Client Error - S3 ListObjectsV2", bucket=bucketName, error=str(e))
         return {"status": "CLIENT_ERROR", "data": str(e)}
     except Exception as ex:
-        print("Exception - Wisdom SearchContent: ", str(ex))
+        log("WARNING", "Exception - S3 ListObjectsV2", bucket=bucketName, error=str(ex))
         return {"status": "EXCEPTION", "data": str(ex)}
 
 # Amazon S3 Get Object: If Object Exists, return S3 Object. Else, return None.
 # Reference: https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3.html#S3.Client.get_object    
 def s3GetObject(bucketName, objectKey):
     try:
-        s3Object = S3_CLIENT.get_object(Bucket=bucketName, Key=objectKey)
-        print("S3 Object: ", s3Object)
+        with traceStage("get_object"):
+            s3Object = getAwsClient("s3").get_object(Bucket=bucketName, Key=objectKey)
+        log("DEBUG", "S3 GetObject", key=objectKey, response=s3Object)
         return s3Object
     except ClientError as e:
-        print("Client Error: ", str(e))
+        # Object was removed after the event was published, there is nothing to synchronize.
+        if e.response["Error"]["Code"] == "NoSuchKey":
+            return {}
+        log("WARNING", "Client Error - S3 GetObject", key=objectKey, error=str(e))
         return {"status": "CLIENT_ERROR", "data": str(e)}
     except Exception as ex:
-        print("Error: ", str(ex))
+        log("WARNING", "Exception - S3 GetObject", key=objectKey, error=str(ex))
         return {"status": "EXCEPTION", "data": str(ex)}
 
+# Amazon S3 Head Object: If Object Exists, return S3 Object metadata (ETag, VersionId, ContentLength). Else, return {}.
+# Reference: https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3/client/head_object.html
+def s3HeadObject(bucketName, objectKey):
+    try:
+        with traceStage("head_object"):
+            return getAwsClient("s3").head_object(Bucket=bucketName, Key=objectKey)
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+            return {}
+        log("WARNING", "Client Error - S3 HeadObject", key=objectKey, error=str(e))
+        return {"status": "CLIENT_ERROR", "data": str(e)}
+    except Exception as ex:
+        log("WARNING", "Exception - S3 HeadObject", key=objectKey, error=str(ex))
+        return {"status": "EXCEPTION", "data": str(ex)}
+
+# Source fingerprint of an S3 Object, stored in Wisdom Content metadata and the Content Index to detect unchanged objects.
+# The S3 sequencer of the synchronized event is stored to discard out-of-order (older) events for the same key.
+def s3ObjectFingerprint(s3Object, sequencer=None):
+    sourceFingerprint = {"sourceS3ETag": s3Object.get("ETag"), "sourceS3Version": s3Object.get("VersionId"), "sourceS3Sequencer": sequencer}
+    return {name: value for name, value in sourceFingerprint.items() if value}
+
 # Wisdom StartContentUpload: Initiate Wisdom Content Upload of S3 Object, returns uploadId
 # Reference: https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/wisdom/client/start_content_upload.html
+# Objects larger than STREAMING_UPLOAD_THRESHOLD_BYTES are streamed to the upload URL, small objects are uploaded from memory.
 def wisdomStartContentUpload(knowledgeBaseId, s3Object):
-    print("Wisdom StartContentUpload S3 Object")
-    print("S3 Object: ", s3Object)
-    print("Content Type: ", s3Object["ContentType"])
-    print("Knowledge Base ID/ARN: ", knowledgeBaseId)
-
     try:
-        response = WISDOM_CLIENT.start_content_upload(
+        response = callWisdomApi("start_content_upload",
             contentType = s3Object["ContentType"],
             knowledgeBaseId = knowledgeBaseId
         )
-        print("Wisdom StartContentUpload Response: ", response)
-        print("Upload ID: ", response["uploadId"])
-        print("Upload Details: ", response)
+        log("DEBUG", "Wisdom StartContentUpload", contentType=s3Object["ContentType"], response=response)
 
-        # Make an HTTP Request to put Object Body to Content Upload URL
+        # Make an HTTP Request to put Object Body to Content Upload URL (the S3 Object Body is read during the upload stage)
         s3StreamingBody = s3Object['Body']
-        streamingBodyRead = s3StreamingBody.read()
-        httpResponse = http.request('PUT', response["url"], headers=response["headersToInclude"], body=streamingBodyRead)
+        contentLength = s3Object.get("ContentLength")
+        with traceStage("upload_content"):
+            if contentLength is not None and contentLength > STREAMING_UPLOAD_THRESHOLD_BYTES:
+                httpResponse = streamContentUpload(response["url"], response["headersToInclude"], s3StreamingBody, contentLength)
+            else:
+                streamingBodyRead = s3StreamingBody.read()
+                httpResponse = http.request('PUT', response["url"], headers=response["headersToInclude"], body=streamingBodyRead)
+        if httpResponse.status >= 300:
+            return {"status": "CLIENT_ERROR", "data": "Content upload failed with HTTP status " + str(httpResponse.status)}
+        METRICS.put("BytesUploaded", contentLength if contentLength is not None else len(streamingBodyRead), "Bytes")
         
         # Return Response Data
-        print("Wisdom StartContentUpload Response: ", response)
         return {"status": "SUCCESS", "data": response["uploadId"]}
     except ClientError as e:
-        print("Wisdom StartContentUpload Client Error: ", str(e))
+        log("WARNING", "Client Error - Wisdom StartContentUpload", error=str(e))
         return {"status": "CLIENT_ERROR", "data": str(e)}
     except Exception as ex:
-        print("Wisdom StartContentUpload Exception: ", str(ex))
+        log("WARNING", "Exception - Wisdom StartContentUpload", error=str(ex))
         return {"status": "EXCEPTION", "data": str(ex)}
 
+# Stream an S3 StreamingBody to the Wisdom Content Upload URL in chunks of UPLOAD_CHUNK_SIZE_BYTES.
+# Content-Length is set from the S3 object, so the request is not chunk-encoded and peak memory stays at one chunk.
+# Retries are disabled because a partially consumed stream cannot be replayed; the SQS message is retried instead.
+# Reference: https://botocore.amazonaws.com/v1/documentation/api/latest/reference/response.html#botocore.response.StreamingBody.iter_chunks
+def streamContentUpload(url, headersToInclude, s3StreamingBody, contentLength):
+    log("DEBUG", "Streaming content upload", contentLength=contentLength)
+    headers = {name: value for name, value in headersToInclude.items() if name.lower() != "content-length"}
+    headers["Content-Length"] = str(contentLength)
+    try:
+        return http.request('PUT', url, headers=headers, body=s3StreamingBody.iter_chunks(UPLOAD_CHUNK_SIZE_BYTES), retries=False)
+    finally:
+        s3StreamingBody.close()
+
 # Amazon Connect Wisdom Create Knowledge Base Content
 # Reference: https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/wisdom/client/create_content.html
 # rawKey is the raw generated Amazon S3 Key (before parsing). This is necessary for LinkOutUri to work properly.
-def wisdomCreateContent(knowledgeBaseId, uploadId, bucketName, objectKey, rawObjectKey):
+def wisdomCreateContent(knowledgeBaseId, uploadId, bucketName, objectKey, rawObjectKey, sourceFingerprint={}, contentName=None, title=None):
     try:
         # Start Wisdom CreateContent
-        response = WISDOM_CLIENT.create_content(
+        response = callWisdomApi("create_content",
             knowledgeBaseId = knowledgeBaseId,
-            name=objectKey, # Must be unique.
+            name=contentName or objectKey, # Must be unique.
             # title=objectKey.split("/")[1].split(".")[0], # Optional: Title is equal to file name without extension or folder prefix.
+            **({"title": title} if title else {}),
             uploadId = uploadId,
             overrideLinkOutUri=f"https://{bucketName}.s3.amazonaws.com/{rawObjectKey}", # Set Link Out URL on Wisdom Tab
             metadata = {
                 "sourceS3Bucket": bucketName,
                 "sourceS3Key": objectKey,
-                # "sourceS3Version": "",
                 "rawObjectKey": rawObjectKey,
-                "s3URL": f"https://{bucketName}.s3.amazonaws.com/{rawObjectKey}"
+                "s3URL": f"https://{bucketName}.s3.amazonaws.com/{rawObjectKey}",
+                **sourceFingerprint # sourceS3ETag, sourceS3Version, sourceS3Sequencer (chunks: chunkIndex, chunkHash). At most 10 metadata keys.
             }
         )
-        # Note: Since "response[content]" contains datetime object, cannot cast it to a string using json.dumps() or str()
-        print("SUCCESS - Wisdom CreateContent Response: ", response)
-        print("Content ID: ", response["content"]["contentId"])
-        return response["content"]
+        log("DEBUG", "Wisdom CreateContent", key=objectKey, response=response)
+        return {"status": "SUCCESS", "data": response["content"]}
     except ClientError as e:
-        print("Client Error: ", str(e))
-        return {"status": "CLIENT_ERROR", "data": str(e)}
+        log("WARNING", "Client Error - Wisdom CreateContent", key=objectKey, error=str(e))
+        return {"status": "CLIENT_ERROR", "data": str(e), "errorCode": e.response["Error"]["Code"]}
     except Exception as ex:
-        print("Exception - Wisdom CreateContent: ", str(ex))
+        log("WARNING", "Exception - Wisdom CreateContent", key=objectKey, error=str(ex))
         return {"status": "EXCEPTION", "data": str(ex)}
 
 # Amazon Connect Wisdom Update Knowledge Base Content (Accepts either Knowledgebase ID or ARN)
 # Reference: https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/wisdom/client/update_content.html
 # rawObjectKey is the Amazon S3 Key (before parsing). This is necessary for LinkOutUri to work properly.
-def wisdomUpdateContent(knowledgeBaseId, uploadId, bucketName, objectKey, rawObjectKey, existingWisdomContent):
+# Without an uploadId, only the title and metadata are updated.
+def wisdomUpdateContent(knowledgeBaseId, uploadId, bucketName, objectKey, rawObjectKey, existingWisdomContent, sourceFingerprint={}, title=None):
     try:
         # Start Wisdom UpdateContent (Unlike CreateContent, UpdateContent only has a parameter 'title', but not 'name'.)
-        response = WISDOM_CLIENT.update_content(
+        response = callWisdomApi("update_content",
             knowledgeBaseId = knowledgeBaseId,
-            title=objectKey, # Set title to Object Key.
-            contentId = existingWisdomContent[0]["contentId"],
-            revisionId = existingWisdomContent[0]["revisionId"],
-            uploadId = uploadId,
+            title=title or objectKey, # Set title to Object Key.
+            contentId = existingWisdomContent["contentId"],
+            revisionId = existingWisdomContent["revisionId"],
+            **({"uploadId": uploadId} if uploadId else {}),
             overrideLinkOutUri=f"https://{bucketName}.s3.amazonaws.com/{rawObjectKey}", # Set Link Out URL on Wisdom Tab
             metadata = {
                 "sourceS3Bucket": bucketName,
                 "sourceS3Key": objectKey,
-                # "sourceS3Version": "",
                 "rawObjectKey": rawObjectKey,
-                "s3URL": f"https://{bucketName}.s3.amazonaws.com/{rawObjectKey}"
+                "s3URL": f"https://{bucketName}.s3.amazonaws.com/{rawObjectKey}",
+                **sourceFingerprint # sourceS3ETag, sourceS3Version, sourceS3Sequencer
             }
         )
-        # Note: Since "response[content]" contains datetime object, cannot cast it to a string using json.dumps() or str()
-        print("SUCCESS - Wisdom UpdateContent Response: ", response)
-        return response["content"]
+        log("DEBUG", "Wisdom UpdateContent", key=objectKey, response=response)
+        return {"status": "SUCCESS", "data": response["content"]}
     except ClientError as e:
-        print("Client Error - Wisdom UpdateContent: ", str(e))
-        return str(e)
+        log("WARNING", "Client Error - Wisdom UpdateContent", key=objectKey, error=str(e))
+        return {"status": "CLIENT_ERROR", "data": str(e), "errorCode": e.response["Error"]["Code"]}
     except Exception as ex:
-        print("Exception - Wisdom UpdateContent: ", str(ex))
-        return str(ex)
+        log("WARNING", "Exception - Wisdom UpdateContent", key=objectKey, error=str(ex))
+        return {"status": "EXCEPTION", "data": str(ex)}
 
 # Amazon Connect Wisdom Delete Knowledge Base Content (Accepts either Knowledgebase ID or ARN)
 # Reference: https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/wisdom/client/delete_content.html
 def wisdomDeleteContent(knowledgeBaseId, existingWisdomContent):
     try:
-        WISDOM_CLIENT.delete_content(
+        callWisdomApi("delete_content",
             knowledgeBaseId = knowledgeBaseId,
-            contentId = existingWisdomContent[0]["contentId"],
+            contentId = existingWisdomContent["contentId"],
         )
-        print("SUCCESS - Wisdom DeleteContent Response: ", json.dumps(existingWisdomContent[0]["title"]))
+        log("DEBUG", "Wisdom DeleteContent", contentId=existingWisdomContent["contentId"])
         return {"status": "SUCCESS", "data": "Wisdom Content Successfully Deleted"}
     except ClientError as e:
-        print("Client Error - Wisdom DeleteContent: ", str(e))
-        return str(e)
+        log("WARNING", "Client Error - Wisdom DeleteContent", contentId=existingWisdomContent["contentId"], error=str(e))
+        return {"status": "CLIENT_ERROR", "data": str(e), "errorCode": e.response["Error"]["Code"]}
+    except Exception as ex:
+        log("WARNING", "Exception - Wisdom DeleteContent", contentId=existingWisdomContent["contentId"], error=str(ex))
+        return {"status": "EXCEPTION", "data": str(ex)}
+
+# Amazon SQS Receive Message: Receive up to maxMessages messages, with parallel requests of up to 10 messages each.
+# Long polling (WaitTimeSeconds) queries every SQS server, so an empty response means the queue is empty.
+# Reference: https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/sqs/client/receive_message.html
+def sqsReceiveMessages(queueUrl, maxMessages, visibilityTimeout):
+    try:
+        requestSizes = [min(10, maxMessages - start) for start in range(0, maxMessages, 10)]
+        receiveMessages = lambda requestSize: getAwsClient("sqs").receive_message(
+            QueueUrl=queueUrl,
+            MaxNumberOfMessages=requestSize,
+            VisibilityTimeout=visibilityTimeout,
+            WaitTimeSeconds=1,
+            AttributeNames=["All"]
+        ).get("Messages", [])
+        with ThreadPoolExecutor(max_workers=len(requestSizes)) as executor:
+            return {"status": "SUCCESS", "data": [message for messages in executor.map(receiveMessages, requestSizes) for message in messages]}
+    except ClientError as e:
+        log("WARNING", "Client Error - SQS ReceiveMessage", queueUrl=queueUrl, error=str(e))
+        return {"status": "CLIENT_ERROR", "data": str(e)}
     except Exception as ex:
-        print("Exception - Wisdom DeleteContent: ", str(ex))
-        return str(ex)
+        log("WARNING", "Exception - SQS ReceiveMessage", queueUrl=queueUrl, error=str(ex))
+        return {"status": "EXCEPTION", "data": str(ex)}
+
+# Amazon SQS Delete Message Batch: Delete messages (by receipt handle), 10 per request. Failures are logged, the messages are received again later.
+# Reference: https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/sqs/client/delete_message_batch.html
+def sqsDeleteMessages(queueUrl, receiptHandles):
+    sqsMessageBatch("delete_message_batch", queueUrl, [{"ReceiptHandle": receiptHandle} for receiptHandle in receiptHandles])
+
+# Amazon SQS Change Message Visibility Batch: Make received messages visible again (Ex. after a dry run).
+# Reference: https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/sqs/client/change_message_visibility_batch.html
+def sqsReleaseMessages(queueUrl, receiptHandles):
+    sqsMessageBatch("change_message_visibility_batch", queueUrl, [{"ReceiptHandle": receiptHandle, "VisibilityTimeout": 0} for receiptHandle in receiptHandles])
+
+def sqsMessageBatch(operationName, queueUrl, entries):
+    for start in range(0, len(entries), 10):
+        batchEntries = [dict(entry, Id=str(index)) for index, entry in enumerate(entries[start:start + 10])]
+        try:
+            response = getattr(getAwsClient("sqs"), operationName)(QueueUrl=queueUrl, Entries=batchEntries)
+            for failed in response.get("Failed", []):
+                log("WARNING", "SQS batch entry failed", operation=operationName, code=failed.get("Code"), error=failed.get("Message"))
+        except Exception as ex:
+            log("WARNING", "Exception - SQS " + operationName, queueUrl=queueUrl, error=str(ex))
+
+if PREWARM_CLIENTS:
+    prewarmAwsClients()
@@ -0,0 +1,371 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+# Local AWS stand-ins used by the Wisdom S3 Sync benchmarks. No AWS account or network access is required.
+# - Amazon S3, Amazon Connect Wisdom and Amazon DynamoDB (Content Index table) requests made by the real boto3 clients are
+#   answered in-process, using the botocore "before-send" event. Requests are still signed, serialized and parsed by botocore, only the HTTP round trip is replaced.
+# - The Wisdom presigned upload URL points at a local HTTP server, so uploads go through the function's urllib3 PoolManager.
+# - Latency (per service) and throttling (a random fraction of requests, or a server-side rate limit per Wisdom operation)
+#   can be injected to reproduce production conditions.
+# Requires boto3 (pip install boto3). Reference: https://boto3.amazonaws.com/v1/documentation/api/latest/guide/events.html
+
+# Python Imports - License: https://docs.python.org/3/license.html
+import os
+import io
+import json
+import time
+import uuid
+import random
+import hashlib
+import threading
+import importlib.util
+from urllib.parse import urlsplit, unquote, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+# AWS SDK Imports
+import boto3
+from botocore.awsrequest import AWSResponse
+
+SYNC_FUNCTION_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "amazon-connect-wisdom-s3-sync.py")
+KNOWLEDGE_BASE_ID = "00000000-0000-4000-8000-000000000000"
+KNOWLEDGE_BASE_ARN = "arn:aws:wisdom:us-east-1:123456789012:knowledge-base/" + KNOWLEDGE_BASE_ID
+BUCKET_NAME = "wisdom-s3-sync-benchmark"
+CONTENT_INDEX_TABLE_NAME = "WisdomContentIndex-benchmark"
+
+# Environment required to load the function outside of AWS Lambda. Credentials are placeholders, requests never leave the process.
+BENCHMARK_ENVIRONMENT = {
+    "AWS_REGION": "us-east-1",
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "AWS_ACCESS_KEY_ID": "AKIABENCHMARK",
+    "AWS_SECRET_ACCESS_KEY": "benchmark",
+    "AWS_EC2_METADATA_DISABLED": "true",
+    "KNOWLEDGE_BASE_ARN": KNOWLEDGE_BASE_ARN,
+    "S3_BUCKET_NAME": BUCKET_NAME
+}
+
+# Raw HTTP response body (urllib3-like) for botocore AWSResponse, supports streaming reads for S3 GetObject.
+class RawBody:
+    def __init__(self, body):
+        self.body = io.BytesIO(body)
+
+    def read(self, amt=None, **kwargs):
+        return self.body.read() if amt is None else self.body.read(amt)
+
+    def stream(self, amt=1024, **kwargs):
+        while True:
+            chunk = self.body.read(amt)
+            if not chunk:
+                break
+            yield chunk
+
+    def close(self):
+        pass
+
+def awsResponse(request, statusCode, headers=None, body=b""):
+    return AWSResponse(request.url, statusCode, headers or {}, RawBody(body))
+
+# Amazon S3 stand-in: HeadObject, GetObject, ListObjectsV2
+class S3StandIn:
+    def __init__(self):
+        self.objects = {}
+        self.lock = threading.Lock()
+
+    # etag may be precomputed when the same body is stored under many keys.
+    def putObject(self, bucket, key, body, contentType="text/html", etag=None):
+        with self.lock:
+            self.objects[(bucket, key)] = {
+                "Body": body,
+                "ContentType": contentType,
+                "ETag": etag or '"' + hashlib.md5(body).hexdigest() + '"',
+                "VersionId": uuid.uuid4().hex
+            }
+
+    def handle(self, operationName, request):
+        url = urlsplit(request.url)
+        bucket, key = self.bucketAndKey(url)
+        if operationName == "ListObjectsV2":
+            return self.listObjects(request, bucket, parse_qs(url.query))
+
+        s3Object = self.objects.get((bucket, key))
+        if s3Object is None:
+            return awsResponse(request, 404, {}, b"" if operationName == "HeadObject" else b"<Error><Code>NoSuchKey</Code><Message>Not Found</Message></Error>")
+        headers = {
+            "Content-Type": s3Object["ContentType"],
+            "Content-Length": str(len(s3Object["Body"])),
+            "ETag": s3Object["ETag"],
+            "x-amz-version-id": s3Object["VersionId"]
+        }
+        return awsResponse(request, 200, headers, b"" if operationName == "HeadObject" else s3Object["Body"])
+
+    def listObjects(self, request, bucket, query):
+        maxKeys = int(query.get("max-keys", ["1000"])[0])
+        start = int(query.get("continuation-token", ["0"])[0])
+        keys = sorted(key for objectBucket, key in self.objects if objectBucket == bucket)
+        page = keys[start:start + maxKeys]
+        contents = "".join(
+            "<Contents><Key>%s</Key><ETag>%s</ETag><Size>%d</Size></Contents>" % (escape(key), escape(self.objects[(bucket, key)]["ETag"]), len(self.objects[(bucket, key)]["Body"]))
+            for key in page
+        )
+        truncated = start + maxKeys < len(keys)
+        nextToken = "<NextContinuationToken>%d</NextContinuationToken>" % (start + maxKeys) if truncated else ""
+        body = '<?xml version="1.0" encoding="UTF-8"?><ListBucketResult><Name>%s</Name><KeyCount>%d</KeyCount><IsTruncated>%s</IsTruncated>%s%s</ListBucketResult>' % (
+            escape(bucket), len(page), "true" if truncated else "false", nextToken, contents)
+        return awsResponse(request, 200, {"Content-Type": "application/xml"}, body.encode())
+
+    # Supports virtual-hosted (bucket.s3.region.amazonaws.com/key) and path style (s3.region.amazonaws.com/bucket/key) URLs
+    @staticmethod
+    def bucketAndKey(url):
+        host = url.hostname or ""
+        path = url.path.lstrip("/")
+        if not host.startswith("s3.") and ".s3." in "." + host:
+            return host.split(".s3")[0], unquote(path)
+        bucket, _, key = path.partition("/")
+        return bucket, unquote(key)
+
+# Amazon Connect Wisdom stand-in: SearchContent, ListContents, StartContentUpload, CreateContent, UpdateContent, DeleteContent
+class WisdomStandIn:
+    def __init__(self, uploadUrl):
+        self.uploadUrl = uploadUrl
+        self.contents = {}
+        self.lock = threading.Lock()
+
+    def handle(self, operationName, request):
+        body = json.loads(request.body or b"{}")
+        pathParts = urlsplit(request.url).path.strip("/").split("/")
+        with self.lock:
+            if operationName == "SearchContent":
+                name = body["searchExpression"]["filters"][0]["value"]
+                return self.json(request, {"contentSummaries": [dict(content) for content in self.contents.values() if content["name"] == name]})
+            if operationName == "ListContents":
+                return self.json(request, {"contentSummaries": [dict(content) for content in self.contents.values()]})
+            if operationName == "StartContentUpload":
+                uploadId = uuid.uuid4().hex
+                return self.json(request, {"uploadId": uploadId, "url": self.uploadUrl + uploadId, "urlExpiry": 4102444800, "headersToInclude": {"x-amz-server-side-encryption": "AES256"}})
+            if operationName == "CreateContent":
+                if any(content["name"] == body["name"] for content in self.contents.values()):
+                    return self.error(request, 409, "ConflictException")
+                content = self.content(uuid.uuid4().hex, body["name"], body.get("title", body["name"]), "1", body.get("metadata", {}))
+                self.contents[content["contentId"]] = content
+                return self.json(request, {"content": content})
+            if operationName == "UpdateContent":
+                content = self.contents.get(pathParts[-1])
+                if content is None:
+                    return self.error(request, 404, "ResourceNotFoundException")
+                if body.get("revisionId") and body["revisionId"] != content["revisionId"]:
+                    return self.error(request, 412, "PreconditionFailedException")
+                content.update(revisionId=str(int(content["revisionId"]) + 1), metadata=body.get("metadata", content["metadata"]), title=body.get("title", content["title"]))
+                return self.json(request, {"content": content})
+            if operationName == "DeleteContent":
+                if self.contents.pop(pathParts[-1], None) is None:
+                    return self.error(request, 404, "ResourceNotFoundException")
+                return self.json(request, {})
+        return self.error(request, 400, "ValidationException")
+
+    @staticmethod
+    def content(contentId, name, title, revisionId, metadata):
+        return {
+            "contentArn": "arn:aws:wisdom:us-east-1:123456789012:content/%s/%s" % (KNOWLEDGE_BASE_ID, contentId),
+            "contentId": contentId,
+            "contentType": "text/html",
+            "knowledgeBaseArn": KNOWLEDGE_BASE_ARN,
+            "knowledgeBaseId": KNOWLEDGE_BASE_ID,
+            "metadata": metadata,
+            "name": name,
+            "revisionId": revisionId,
+            "status": "ACTIVE",
+            "title": title
+        }
+
+    @staticmethod
+    def json(request, body):
+        return awsResponse(request, 200, {"Content-Type": "application/json"}, json.dumps(body).encode())
+
+    @staticmethod
+    def error(request, statusCode, errorCode):
+        return awsResponse(request, statusCode, {"Content-Type": "application/json", "x-amzn-ErrorType": errorCode}, json.dumps({"message": errorCode}).encode())
+
+# Amazon DynamoDB stand-in for the Content Index table (CONTENT_INDEX_TABLE): GetItem, PutItem, DeleteItem.
+# Items are stored as DynamoDB attribute values, keyed by the table's key schema (knowledgeBaseId, objectKey).
+class DynamoDBStandIn:
+    def __init__(self):
+        self.items = {}
+        self.lock = threading.Lock()
+
+    def handle(self, operationName, request):
+        body = json.loads(request.body or b"{}")
+        with self.lock:
+            if operationName == "GetItem":
+                item = self.items.get(self.itemKey(body["Key"]))
+                return self.json(request, {"Item": item} if item else {})
+            if operationName == "PutItem":
+                self.items[self.itemKey(body["Item"])] = body["Item"]
+                return self.json(request, {})
+            if operationName == "DeleteItem":
+                self.items.pop(self.itemKey(body["Key"]), None)
+                return self.json(request, {})
+        return self.json(request, {"__type": "com.amazon.coral.validate#ValidationException", "message": operationName}, 400)
+
+    @staticmethod
+    def itemKey(item):
+        return item["knowledgeBaseId"]["S"], item["objectKey"]["S"]
+
+    @staticmethod
+    def json(request, body, statusCode=200):
+        return awsResponse(request, statusCode, {"Content-Type": "application/x-amz-json-1.0"}, json.dumps(body).encode())
+
+# Local HTTP server standing in for the Wisdom presigned upload URL. Request bodies are read in chunks and discarded.
+class UploadServer:
+    def __init__(self, latencyMs=0):
+        uploadServer = self
+        self.bytesReceived = 0
+        self.uploads = 0
+        self.lock = threading.Lock()
+
+        class UploadHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_PUT(self):
+                remaining = int(self.headers.get("Content-Length", "0"))
+                while remaining > 0:
+                    remaining -= len(self.rfile.read(min(remaining, 64 * 1024)))
+                time.sleep(latencyMs / 1000)
+                uploadServer.onUpload(int(self.headers.get("Content-Length", "0")))
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), UploadHandler)
+        self.server.daemon_threads = True
+        self.url = "http://127.0.0.1:%d/uploads/" % self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def onUpload(self, contentLength):
+        with self.lock:
+            self.uploads += 1
+            self.bytesReceived += contentLength
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+# Server-side rate limit (requests/second) of a single Wisdom operation. Requests over the limit are throttled, like the Wisdom API.
+class ServerRateLimit:
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+# Local AWS environment: registers the S3/Wisdom/DynamoDB stand-ins on the default boto3 session, so every client the function creates uses them.
+# Must be created before the function module is loaded (clients may be created at import time with PREWARM_CLIENTS=true).
+# - latencyMs: added latency per service (Ex. {"s3": 20, "wisdom": 50, "dynamodb": 5, "upload": 100})
+# - throttleRate: fraction of S3 (503 SlowDown) and Wisdom (429 ThrottlingException) requests that are throttled
+# - wisdomRateLimit: server-side rate limit (requests/second) per Wisdom operation
+class LocalAws:
+    def __init__(self, latencyMs=None, throttleRate=0.0, wisdomRateLimit=None):
+        os.environ.update(BENCHMARK_ENVIRONMENT)
+        self.latencyMs = latencyMs or {}
+        self.throttleRate = throttleRate
+        self.wisdomRateLimit = wisdomRateLimit
+        self.wisdomRateLimits = {}
+        self.uploadServer = UploadServer(self.latencyMs.get("upload", 0))
+        self.s3 = S3StandIn()
+        self.wisdom = WisdomStandIn(self.uploadServer.url)
+        self.dynamodb = DynamoDBStandIn()
+        self.requestCounts = {}
+        self.throttleCounts = {}
+        self.countsLock = threading.Lock()
+        boto3.setup_default_session(region_name=BENCHMARK_ENVIRONMENT["AWS_REGION"])
+        boto3.DEFAULT_SESSION.events.register("before-send", self.beforeSend)
+
+    def beforeSend(self, request, event_name, **kwargs):
+        _, serviceId, operationName = event_name.split(".", 2)
+        self.count(self.requestCounts, operationName)
+        time.sleep(self.latencyMs.get(serviceId, 0) / 1000)
+        if self.isThrottled(serviceId, operationName):
+            self.count(self.throttleCounts, operationName)
+            if serviceId == "s3":
+                return awsResponse(request, 503, {}, b"<Error><Code>SlowDown</Code><Message>Please reduce your request rate.</Message></Error>")
+            return WisdomStandIn.error(request, 429, "ThrottlingException")
+        if serviceId == "s3":
+            return self.s3.handle(operationName, request)
+        if serviceId == "wisdom":
+            return self.wisdom.handle(operationName, request)
+        if serviceId == "dynamodb":
+            return self.dynamodb.handle(operationName, request)
+        raise RuntimeError("No local stand-in for AWS service: " + serviceId)
+
+    def isThrottled(self, serviceId, operationName):
+        if self.throttleRate and random.random() < self.throttleRate:
+            return True
+        if serviceId == "wisdom" and self.wisdomRateLimit:
+            with self.countsLock:
+                rateLimit = self.wisdomRateLimits.setdefault(operationName, ServerRateLimit(self.wisdomRateLimit))
+            return not rateLimit.allow()
+        return False
+
+    def count(self, counts, operationName):
+        with self.countsLock:
+            counts[operationName] = counts.get(operationName, 0) + 1
+
+    def close(self):
+        self.uploadServer.close()
+
+# Load the Wisdom S3 Sync function module (amazon-connect-wisdom-s3-sync.py) as a fresh module, with optional environment overrides.
+def loadSyncFunction(environment=None):
+    os.environ.update(environment or {})
+    spec = importlib.util.spec_from_file_location("wisdom_s3_sync", SYNC_FUNCTION_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+# SQS Event (S3 Event Notifications -> SQS), one SQS message per S3 record, sent and received now.
+def sqsEvent(s3Records):
+    timestamp = str(int(time.time() * 1000))
+    return {"Records": [{
+        "messageId": uuid.uuid4().hex,
+        "body": json.dumps({"Records": [s3Record]}),
+        "attributes": {"SentTimestamp": timestamp, "ApproximateFirstReceiveTimestamp": timestamp},
+        "eventSource": "aws:sqs"
+    } for s3Record in s3Records]}
+
+# S3 Event Notification record. Sequencers increase with every call, like S3 events for a single key.
+SEQUENCER_LOCK = threading.Lock()
+SEQUENCER = [0]
+def s3Record(key, eventName="ObjectCreated:Put", bucket=BUCKET_NAME):
+    with SEQUENCER_LOCK:
+        SEQUENCER[0] += 1
+        sequencer = "%018X" % SEQUENCER[0]
+    return {
+        "eventSource": "aws:s3",
+        "eventName": eventName,
+        "s3": {"bucket": {"name": bucket}, "object": {"key": key, "sequencer": sequencer}}
+    }
+
+# Minimal AWS Lambda context object
+class LambdaContext:
+    function_name = "WisdomS3SyncHandler-benchmark"
+    memory_limit_in_mb = 256
+    invoked_function_arn = "arn:aws:lambda:us-east-1:123456789012:function:WisdomS3SyncHandler-benchmark"
+    aws_request_id = "benchmark"
+    log_stream_name = "benchmark"
+
+    def __init__(self, timeoutMs=60000):
+        self.timeoutMs = timeoutMs
+
+    def get_remaining_time_in_millis(self):
+        return self.timeoutMs
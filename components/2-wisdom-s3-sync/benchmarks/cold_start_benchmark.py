@@ -0,0 +1,83 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+# Cold start benchmark for the Wisdom S3 Sync function, run against local AWS stand-ins (aws_stand_ins.py).
+# Each run is a fresh Python process (a cold container) that measures:
+# - boto3 import time
+# - function module load time (Lambda init phase)
+# - first event latency (first invocation after a cold start) and warm event latency (second invocation)
+# for PREWARM_CLIENTS=false (clients created on first use) and PREWARM_CLIENTS=true (clients created during init).
+# Usage: python cold_start_benchmark.py [--runs 10] [--object-size 4096]
+
+# Python Imports - License: https://docs.python.org/3/license.html
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+MEASUREMENTS = ("boto3ImportMs", "moduleLoadMs", "firstEventMs", "warmEventMs")
+
+# Single cold start, run in a child process. Prints measurements as JSON.
+def measureColdStart(prewarmClients, objectSize):
+    start = time.perf_counter()
+    import boto3  # noqa: F401
+    boto3ImportMs = (time.perf_counter() - start) * 1000
+
+    from aws_stand_ins import LocalAws, loadSyncFunction, sqsEvent, s3Record, LambdaContext, BUCKET_NAME
+    localAws = LocalAws()
+    for key in ("cold.html", "warm.html"):
+        localAws.s3.putObject(BUCKET_NAME, key, b"<html>" + b"x" * objectSize + b"</html>")
+
+    start = time.perf_counter()
+    syncFunction = loadSyncFunction({"PREWARM_CLIENTS": "true" if prewarmClients else "false"})
+    moduleLoadMs = (time.perf_counter() - start) * 1000
+
+    latencies = []
+    for key in ("cold.html", "warm.html"):
+        start = time.perf_counter()
+        response = syncFunction.lambda_handler(sqsEvent([s3Record(key)]), LambdaContext())
+        latencies.append((time.perf_counter() - start) * 1000)
+        if response["batchItemFailures"]:
+            raise RuntimeError("Synchronization failed: " + json.dumps(response))
+    localAws.close()
+
+    return {"boto3ImportMs": boto3ImportMs, "moduleLoadMs": moduleLoadMs, "firstEventMs": latencies[0], "warmEventMs": latencies[1]}
+
+def runColdStart(prewarmClients, objectSize):
+    command = [sys.executable, os.path.abspath(__file__), "--child", "--object-size", str(objectSize)]
+    if prewarmClients:
+        command.append("--prewarm-clients")
+    # The function's JSON log lines (log()) are discarded, the measurements are the last line.
+    output = subprocess.run(command, check=True, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+def main():
+    parser = argparse.ArgumentParser(description="Wisdom S3 Sync cold start benchmark (local AWS stand-ins).")
+    parser.add_argument("--runs", type=int, default=10, help="cold starts per configuration")
+    parser.add_argument("--object-size", type=int, default=4096, help="S3 object size (bytes)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--prewarm-clients", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        measurements = measureColdStart(args.prewarm_clients, args.object_size)
+        print(json.dumps(measurements))
+        return
+
+    print("%-16s %-14s %10s %10s" % ("PREWARM_CLIENTS", "Measurement", "p50 (ms)", "p90 (ms)"))
+    for prewarmClients in (False, True):
+        runs = [runColdStart(prewarmClients, args.object_size) for _ in range(args.runs)]
+        for measurement in MEASUREMENTS:
+            values = [run[measurement] for run in runs]
+            print("%-16s %-14s %10.1f %10.1f" % (str(prewarmClients).lower(), measurement, statistics.median(values), percentile(values, 0.9)))
+
+if __name__ == "__main__":
+    main()
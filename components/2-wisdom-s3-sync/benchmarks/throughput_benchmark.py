@@ -0,0 +1,155 @@
+# Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
+# SPDX-License-Identifier: MIT-0
+
+# Throughput benchmark / load test for the Wisdom S3 Sync function, run against local AWS stand-ins (aws_stand_ins.py).
+# Synthetic SQS batches of S3 ObjectCreated events are fed into lambda_handler for every combination of object size and
+# batch size. Each combination runs in a fresh Python process (a warm container, after one warm-up event) and reports:
+# - objects per second
+# - p50/p99 per-object latency (from the function's per-object summary log lines)
+# - peak RSS of the process
+# Latency and throttling can be injected into the stand-ins. With --min-objects-per-second / --max-p99-ms the benchmark
+# exits with status 1 when a combination misses its target, so it can be used as a throughput regression gate.
+# Usage: python throughput_benchmark.py [--object-sizes 1024,1048576] [--batch-sizes 1,10,100] [--wisdom-latency-ms 50] [--content-index-table]
+
+# Python Imports - License: https://docs.python.org/3/license.html
+import io
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import resource
+import subprocess
+import contextlib
+
+# Run a single combination (object size, batch size) in a child process. Prints the result as JSON.
+def measureThroughput(args):
+    from aws_stand_ins import LocalAws, loadSyncFunction, sqsEvent, s3Record, LambdaContext, BUCKET_NAME, CONTENT_INDEX_TABLE_NAME
+    localAws = LocalAws(
+        latencyMs={"s3": args.s3_latency_ms, "wisdom": args.wisdom_latency_ms, "dynamodb": args.dynamodb_latency_ms, "upload": args.upload_latency_ms},
+        throttleRate=args.throttle_rate,
+        wisdomRateLimit=args.wisdom_rate_limit
+    )
+    syncFunction = loadSyncFunction({
+        "MAX_CONCURRENCY": str(args.max_concurrency),
+        "WISDOM_API_RATE_LIMIT": str(args.client_rate_limit),
+        "LOG_LEVEL": "INFO",
+        "LOG_OBJECT_SAMPLE_RATE": "1",
+        "METRICS_ENABLED": "false",
+        # The deployed function uses the DynamoDB backed Content Index (TableContentIndex)
+        "CONTENT_INDEX_TABLE": CONTENT_INDEX_TABLE_NAME if args.content_index_table else ""
+    })
+
+    # Every key holds the same body, so stand-in memory does not grow with the number of objects. Each key gets its own
+    # ETag: the transformed content cache is keyed by ETag, so identical ETags would skip GetObject and the transforms.
+    body = b"<html>" + b"x" * max(0, args.object_size - 13) + b"</html>"
+    keys = ["warm-up.html"] + ["benchmark/%05d.html" % index for index in range(args.batches * args.batch_size)]
+    for key in keys:
+        localAws.s3.putObject(BUCKET_NAME, key, body, etag='"' + hashlib.md5(key.encode()).hexdigest() + '"')
+
+    # Warm-up event: clients, connection pools and rate limiters are created before measuring.
+    with contextlib.redirect_stdout(io.StringIO()):
+        syncFunction.lambda_handler(sqsEvent([s3Record(keys[0])]), LambdaContext())
+
+    latencies = []
+    failedObjects = 0
+    elapsed = 0.0
+    for batch in range(args.batches):
+        batchKeys = keys[1 + batch * args.batch_size:1 + (batch + 1) * args.batch_size]
+        event = sqsEvent([s3Record(key) for key in batchKeys])
+        output = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            syncFunction.lambda_handler(event, LambdaContext())
+        elapsed += time.perf_counter() - start
+        for line in output.getvalue().splitlines():
+            record = json.loads(line)
+            if record.get("message") in ("Object synchronized", "Object synchronization failed"):
+                latencies.append(record["durationMs"])
+                failedObjects += record["status"] != "SUCCESS"
+    localAws.close()
+
+    objects = args.batches * args.batch_size
+    return {
+        "objectSize": args.object_size,
+        "batchSize": args.batch_size,
+        "objects": objects,
+        "failedObjects": failedObjects,
+        "objectsPerSecond": round(objects / elapsed, 1),
+        "p50Ms": percentile(latencies, 0.50),
+        "p99Ms": percentile(latencies, 0.99),
+        # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+        "peakRssMb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1),
+        "throttles": sum(localAws.throttleCounts.values())
+    }
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+def runThroughput(args, objectSize, batchSize):
+    command = [sys.executable, os.path.abspath(__file__), "--child", "--object-size", str(objectSize), "--batch-size", str(batchSize)]
+    for option in ("batches", "max_concurrency", "client_rate_limit", "s3_latency_ms", "wisdom_latency_ms", "dynamodb_latency_ms", "upload_latency_ms", "throttle_rate", "wisdom_rate_limit"):
+        if getattr(args, option) is not None:
+            command += ["--" + option.replace("_", "-"), str(getattr(args, option))]
+    if args.content_index_table:
+        command.append("--content-index-table")
+    output = subprocess.run(command, check=True, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def integerList(value):
+    return [int(item) for item in value.split(",") if item.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(description="Wisdom S3 Sync throughput benchmark (local AWS stand-ins).")
+    parser.add_argument("--object-sizes", type=integerList, default=[1024, 65536, 1048576, 8388608], help="comma separated S3 object sizes (bytes)")
+    parser.add_argument("--batch-sizes", type=integerList, default=[1, 10, 100], help="comma separated SQS batch sizes (messages)")
+    parser.add_argument("--batches", type=int, default=5, help="batches per combination")
+    parser.add_argument("--max-concurrency", type=int, default=8, help="function MAX_CONCURRENCY")
+    parser.add_argument("--client-rate-limit", type=float, default=1000, help="function WISDOM_API_RATE_LIMIT (requests/second per operation)")
+    parser.add_argument("--s3-latency-ms", type=float, default=0, help="latency added to every Amazon S3 request")
+    parser.add_argument("--wisdom-latency-ms", type=float, default=0, help="latency added to every Wisdom request")
+    parser.add_argument("--dynamodb-latency-ms", type=float, default=0, help="latency added to every Content Index table (DynamoDB) request")
+    parser.add_argument("--content-index-table", action="store_true", help="use the DynamoDB backed Content Index (CONTENT_INDEX_TABLE), like the deployed function")
+    parser.add_argument("--upload-latency-ms", type=float, default=0, help="latency added to every content upload (presigned URL PUT)")
+    parser.add_argument("--throttle-rate", type=float, default=0, help="fraction of Amazon S3 and Wisdom requests that are throttled")
+    parser.add_argument("--wisdom-rate-limit", type=float, default=None, help="server-side Wisdom rate limit (requests/second per operation)")
+    parser.add_argument("--min-objects-per-second", type=float, default=None, help="fail when a combination is slower")
+    parser.add_argument("--max-p99-ms", type=float, default=None, help="fail when a combination has a higher p99 latency")
+    parser.add_argument("--json", action="store_true", help="print results as JSON lines")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--object-size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--batch-size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        print(json.dumps(measureThroughput(args)))
+        return
+
+    failedTargets = []
+    if not args.json:
+        print("%12s %10s %10s %10s %10s %12s %10s %10s" % ("Object Size", "Batch Size", "Objects/s", "p50 (ms)", "p99 (ms)", "Peak RSS (MB)", "Failed", "Throttles"))
+    for objectSize in args.object_sizes:
+        for batchSize in args.batch_sizes:
+            result = runThroughput(args, objectSize, batchSize)
+            if args.json:
+                print(json.dumps(result))
+            else:
+                print("%12d %10d %10.1f %10.1f %10.1f %12.1f %10d %10d" % (objectSize, batchSize, result["objectsPerSecond"], result["p50Ms"], result["p99Ms"], result["peakRssMb"], result["failedObjects"], result["throttles"]))
+            if args.min_objects_per_second is not None and result["objectsPerSecond"] < args.min_objects_per_second:
+                failedTargets.append("%d bytes x %d: %.1f objects/s < %.1f" % (objectSize, batchSize, result["objectsPerSecond"], args.min_objects_per_second))
+            if args.max_p99_ms is not None and result["p99Ms"] > args.max_p99_ms:
+                failedTargets.append("%d bytes x %d: p99 %.1f ms > %.1f ms" % (objectSize, batchSize, result["p99Ms"], args.max_p99_ms))
+            if result["failedObjects"]:
+                failedTargets.append("%d bytes x %d: %d objects failed" % (objectSize, batchSize, result["failedObjects"]))
+
+    for failedTarget in failedTargets:
+        print("FAILED - " + failedTarget, file=sys.stderr)
+    sys.exit(1 if failedTargets else 0)
+
+if __name__ == "__main__":
+    main()